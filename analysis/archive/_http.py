@@ -0,0 +1,46 @@
+"""Shared aiohttp session factory for the analysis test scripts.
+
+Each script historically opened its own ClientSession, so running several
+back to back repeated the TLS handshake and connection-pool warmup against
+the same Deribit host. make_session() centralizes the connector tuning and
+get_session() hands out one cached session that combined runs can share.
+"""
+
+import aiohttp
+from contextlib import asynccontextmanager
+
+_session = None
+
+
+def make_session() -> aiohttp.ClientSession:
+    """Build a ClientSession with the connector tuning used across the scripts"""
+    # Single-host workload: keep connections warm between the many small
+    # chunk requests and ask for compressed trade payloads
+    connector = aiohttp.TCPConnector(limit_per_host=64, ttl_dns_cache=300, keepalive_timeout=60)
+    timeout = aiohttp.ClientTimeout(total=30)
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={"Accept-Encoding": "gzip"}
+    )
+
+
+@asynccontextmanager
+async def get_session():
+    """Yield the cached shared session, creating it on first use.
+
+    The session stays open between uses so the connection pool survives
+    across scripts; call close_session() once at the end of a combined run.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = make_session()
+    yield _session
+
+
+async def close_session():
+    """Close the cached session (if any) and drop the reference"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
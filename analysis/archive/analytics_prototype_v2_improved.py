@@ -7,6 +7,7 @@ Better rate limiting and error handling to avoid API issues
 import asyncio
 import aiohttp
 import json
+import time
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
@@ -36,11 +37,37 @@ class DeribitAnalyticsV2Improved:
         self.base_url = "https://www.deribit.com/api/v2"
         self.session = None
         self.rate_limit_delay = 0.2  # 200ms between requests
-        
+        # Minute-bucketed response cache: identical fetches within the
+        # same minute short-circuit the network on interactive re-runs
+        self._fetch_cache = {}
+
+    def _cache_get(self, key: Tuple):
+        """Return the cached response for this minute bucket, if any"""
+        return self._fetch_cache.get(key)
+
+    def _cache_store(self, key: Tuple, value):
+        """Store a response and drop buckets older than the previous minute"""
+        self._fetch_cache[key] = value
+        floor = key[-1] - 1
+        self._fetch_cache = {k: v for k, v in self._fetch_cache.items() if k[-1] >= floor}
+        return value
+
     async def __aenter__(self):
-        # Add timeout and rate limiting
+        # Tuned connector: keep connections warm across retries and
+        # currency queries, cache DNS so repeated runs skip resolution
+        connector = aiohttp.TCPConnector(
+            limit=32,
+            limit_per_host=16,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
         timeout = aiohttp.ClientTimeout(total=30)
-        self.session = aiohttp.ClientSession(timeout=timeout)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            # Book summaries compress 5-10x; ask for gzip explicitly
+            headers={"Accept-Encoding": "gzip"}
+        )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -114,9 +141,14 @@ class DeribitAnalyticsV2Improved:
     
     async def fetch_instruments_summary(self, currency: str = "BTC") -> List[Dict]:
         """Fetch options summary which includes basic OI data"""
+        cache_key = ("instruments", currency, int(time.time() // 60))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         url = f"{self.base_url}/public/get_book_summary_by_currency"
         params = {"currency": currency, "kind": "option"}
-        
+
         data = await self.fetch_with_retry(url, params)
         
         if not isinstance(data, list):
@@ -137,12 +169,17 @@ class DeribitAnalyticsV2Improved:
                 enhanced_instruments.append(instrument)
         
         print(f"Enhanced {len(enhanced_instruments)} instruments with summary data")
-        return enhanced_instruments
-    
+        return self._cache_store(cache_key, enhanced_instruments)
+
     async def fetch_futures_trades(self, currency: str = "BTC", hours_back: int = 24) -> List[Dict]:
         """Fetch historical futures trades for volume profile analysis"""
+        cache_key = ("futures_trades", currency, hours_back, int(time.time() // 60))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         url = f"{self.base_url}/public/get_last_trades_by_currency"
-        
+
         params = {
             "currency": currency,
             "kind": "future",
@@ -176,7 +213,7 @@ class DeribitAnalyticsV2Improved:
                 filtered_trades.append(trade)
         
         print(f"Filtered to {len(filtered_trades)} recent trades")
-        return filtered_trades
+        return self._cache_store(cache_key, filtered_trades)
     
     def parse_instrument_name(self, instrument_name: str) -> Dict:
         """Parse Deribit instrument name into components"""
@@ -615,90 +652,44 @@ class DeribitAnalyticsV2Improved:
             
             print(f"Calculated levels - Max: ${max_1d:,.2f}, Min: ${min_1d:,.2f}, HVL: ${hvl:,.2f}")
             
-            # Fix 4: Confidence weighting based on distance to spot
-            def calculate_confidence(base_confidence: float, distance_pct: float) -> float:
-                """Reduce confidence for strikes far from spot using exponential decay"""
-                return base_confidence * math.exp(-abs(distance_pct) / 10.0)
-            
-            # Build key levels list
+            # Build levels as parallel columns (SoA) so distance and
+            # confidence math runs as vector ops instead of per-level calls
+            level_specs = [
+                ("1D Max", max_1d, 0.9 if max_1d > 0 else 0.1),
+                ("1D Min", min_1d, 0.9 if min_1d > 0 else 0.1),
+                ("Call Resistance", option_levels["call_resistance"], 0.8 if option_levels["has_data"] else 0.3),
+                ("Call Resistance 0DTE", option_levels["call_resistance_0dte"], 0.9 if option_levels["has_data"] else 0.2),
+                ("Call Resistance 1W", option_levels["call_resistance_1w"], 0.8 if option_levels["has_1w_data"] else 0.2),
+                ("Call Resistance 1M", option_levels["call_resistance_1m"], 0.7 if option_levels["has_1m_data"] else 0.2),
+                (f"Gamma Wall ({option_levels['gamma_wall_direction']})", option_levels["gamma_wall"], 0.8 if option_levels["has_data"] else 0.2),
+                ("HVL", hvl, 0.7 if volume_levels else 0.2),
+                ("Put Support", option_levels["put_support"], 0.8 if option_levels["has_data"] else 0.3),
+                ("Put Support 0DTE", option_levels["put_support_0dte"], 0.9 if option_levels["has_data"] else 0.2),
+                ("Put Support 1W", option_levels["put_support_1w"], 0.8 if option_levels["has_1w_data"] else 0.2),
+                ("Put Support 1M", option_levels["put_support_1m"], 0.7 if option_levels["has_1m_data"] else 0.2)
+            ]
+
+            names = [spec[0] for spec in level_specs]
+            values = np.array([spec[1] for spec in level_specs], dtype=float)
+            base_confidences = np.array([spec[2] for spec in level_specs], dtype=float)
+
+            distances = (values - spot_price) / spot_price * 100.0
+            # Fix 4: Confidence weighting - exponential decay with distance from spot
+            confidences = base_confidences * np.exp(-np.abs(distances) / 10.0)
+
+            # Sort by distance to spot (absolute value); instances only
+            # materialize here, at the caller-facing boundary
+            order = np.argsort(np.abs(distances))
             key_levels = [
                 KeyLevel(
-                    name="1D Max",
-                    value=max_1d,
-                    distance_to_spot=self.calculate_distance_to_spot(max_1d, spot_price),
-                    confidence=calculate_confidence(0.9 if max_1d > 0 else 0.1, self.calculate_distance_to_spot(max_1d, spot_price))
-                ),
-                KeyLevel(
-                    name="1D Min",
-                    value=min_1d,
-                    distance_to_spot=self.calculate_distance_to_spot(min_1d, spot_price),
-                    confidence=calculate_confidence(0.9 if min_1d > 0 else 0.1, self.calculate_distance_to_spot(min_1d, spot_price))
-                ),
-                KeyLevel(
-                    name="Call Resistance",
-                    value=option_levels["call_resistance"],
-                    distance_to_spot=self.calculate_distance_to_spot(option_levels["call_resistance"], spot_price),
-                    confidence=calculate_confidence(0.8 if option_levels["has_data"] else 0.3, self.calculate_distance_to_spot(option_levels["call_resistance"], spot_price))
-                ),
-                KeyLevel(
-                    name="Call Resistance 0DTE",
-                    value=option_levels["call_resistance_0dte"],
-                    distance_to_spot=self.calculate_distance_to_spot(option_levels["call_resistance_0dte"], spot_price),
-                    confidence=calculate_confidence(0.9 if option_levels["has_data"] else 0.2, self.calculate_distance_to_spot(option_levels["call_resistance_0dte"], spot_price))
-                ),
-                KeyLevel(
-                    name="Call Resistance 1W",
-                    value=option_levels["call_resistance_1w"],
-                    distance_to_spot=self.calculate_distance_to_spot(option_levels["call_resistance_1w"], spot_price),
-                    confidence=calculate_confidence(0.8 if option_levels["has_1w_data"] else 0.2, self.calculate_distance_to_spot(option_levels["call_resistance_1w"], spot_price))
-                ),
-                KeyLevel(
-                    name="Call Resistance 1M",
-                    value=option_levels["call_resistance_1m"],
-                    distance_to_spot=self.calculate_distance_to_spot(option_levels["call_resistance_1m"], spot_price),
-                    confidence=calculate_confidence(0.7 if option_levels["has_1m_data"] else 0.2, self.calculate_distance_to_spot(option_levels["call_resistance_1m"], spot_price))
-                ),
-                KeyLevel(
-                    name=f"Gamma Wall ({option_levels['gamma_wall_direction']})",
-                    value=option_levels["gamma_wall"],
-                    distance_to_spot=self.calculate_distance_to_spot(option_levels["gamma_wall"], spot_price),
-                    confidence=calculate_confidence(0.8 if option_levels["has_data"] else 0.2, self.calculate_distance_to_spot(option_levels["gamma_wall"], spot_price))
-                ),
-                KeyLevel(
-                    name="HVL",
-                    value=hvl,
-                    distance_to_spot=self.calculate_distance_to_spot(hvl, spot_price),
-                    confidence=calculate_confidence(0.7 if volume_levels else 0.2, self.calculate_distance_to_spot(hvl, spot_price))
-                ),
-                KeyLevel(
-                    name="Put Support",
-                    value=option_levels["put_support"],
-                    distance_to_spot=self.calculate_distance_to_spot(option_levels["put_support"], spot_price),
-                    confidence=calculate_confidence(0.8 if option_levels["has_data"] else 0.3, self.calculate_distance_to_spot(option_levels["put_support"], spot_price))
-                ),
-                KeyLevel(
-                    name="Put Support 0DTE",
-                    value=option_levels["put_support_0dte"],
-                    distance_to_spot=self.calculate_distance_to_spot(option_levels["put_support_0dte"], spot_price),
-                    confidence=calculate_confidence(0.9 if option_levels["has_data"] else 0.2, self.calculate_distance_to_spot(option_levels["put_support_0dte"], spot_price))
-                ),
-                KeyLevel(
-                    name="Put Support 1W",
-                    value=option_levels["put_support_1w"],
-                    distance_to_spot=self.calculate_distance_to_spot(option_levels["put_support_1w"], spot_price),
-                    confidence=calculate_confidence(0.8 if option_levels["has_1w_data"] else 0.2, self.calculate_distance_to_spot(option_levels["put_support_1w"], spot_price))
-                ),
-                KeyLevel(
-                    name="Put Support 1M",
-                    value=option_levels["put_support_1m"],
-                    distance_to_spot=self.calculate_distance_to_spot(option_levels["put_support_1m"], spot_price),
-                    confidence=calculate_confidence(0.7 if option_levels["has_1m_data"] else 0.2, self.calculate_distance_to_spot(option_levels["put_support_1m"], spot_price))
+                    name=names[i],
+                    value=float(values[i]),
+                    distance_to_spot=float(distances[i]),
+                    confidence=float(confidences[i])
                 )
+                for i in order
             ]
             
-            # Sort by distance to spot (absolute value)
-            key_levels.sort(key=lambda x: abs(x.distance_to_spot))
-            
             # Extract Put/Call ratios
             pc_ratios = {
                 "current": option_levels["pc_ratio_current"],
@@ -746,7 +737,15 @@ async def main():
                 json_data = {
                     "currency": currency,
                     "timestamp": datetime.now().isoformat(),
-                    "key_levels": [level.to_dict() for level in key_levels],
+                    "key_levels": [
+                        {
+                            "name": level.name,
+                            "value": level.value,
+                            "distance_to_spot": f"{level.distance_to_spot:.2f}%",
+                            "confidence": level.confidence
+                        }
+                        for level in key_levels
+                    ],
                     "pc_ratios": pc_ratios
                 }
                 
@@ -1,10 +1,21 @@
 import asyncio
 import aiohttp
+import logging
 import math
+import orjson
+import re
+import time
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 import numpy as np
-from scipy.stats import norm
+
+# Hot paths log lazily instead of print()ing - stdout locking serializes the
+# concurrent chunk fetches and f-strings are formatted even when discarded
+logger = logging.getLogger(__name__)
+
+# Option instrument name, e.g. BTC-25SEP20-6000-C. Matching up front is a
+# C-level test that replaces try/except around every malformed row
+_INSTR_RE = re.compile(r"^([A-Z]+)-(\d{1,2}[A-Z]{3}\d{2})-(\d+)-([CP])$")
 
 class DeribitAnalyticsWithPagination:
     """Enhanced analytics engine with complete options flow coverage via pagination"""
@@ -12,6 +23,12 @@ class DeribitAnalyticsWithPagination:
     def __init__(self, base_url: str = "https://deribit.com/api/v2"):
         self.base_url = base_url
         self.session = None
+        # TTL caches: repeated analyses (BTC + ETH loops, schedulers) re-ask
+        # for data that barely changes between runs
+        self._index_price_cache: Dict[str, tuple] = {}
+        self._book_summary_cache: Dict[str, tuple] = {}
+        self.index_price_ttl = 5.0    # spot moves fast, keep this short
+        self.book_summary_ttl = 60.0  # OI shifts slowly
     
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
@@ -23,30 +40,33 @@ class DeribitAnalyticsWithPagination:
     
     async def fetch_with_retry(self, url: str, params: dict, max_retries: int = 3) -> dict:
         """Fetch data with retry logic and rate limiting"""
+        # Convert boolean parameters to strings once, not per retry attempt;
+        # most calls carry no bools and can pass the dict through untouched
+        if any(isinstance(value, bool) for value in params.values()):
+            str_params = {
+                key: ("true" if value is True else "false" if value is False else value)
+                for key, value in params.items()
+            }
+        else:
+            str_params = params
+
         for attempt in range(max_retries):
             try:
-                # Convert boolean parameters to strings
-                str_params = {}
-                for key, value in params.items():
-                    if isinstance(value, bool):
-                        str_params[key] = "true" if value else "false"
-                    else:
-                        str_params[key] = value
-                
                 async with self.session.get(url, params=str_params) as response:
                     if response.status == 429:  # Rate limited
                         wait_time = 2 ** attempt
-                        print(f"Rate limited, waiting {wait_time}s before retry {attempt + 1}")
+                        logger.warning("Rate limited, waiting %ss before retry %d", wait_time, attempt + 1)
                         await asyncio.sleep(wait_time)
                         continue
                     
                     response.raise_for_status()
-                    data = await response.json()
+                    # orjson parses the dense trade arrays several times faster than stdlib json
+                    data = orjson.loads(await response.read())
                     return data.get("result", data)
                     
             except Exception as e:
                 if attempt == max_retries - 1:
-                    print(f"Failed to fetch {url} after {max_retries} attempts: {e}")
+                    logger.error("Failed to fetch %s after %d attempts: %s", url, max_retries, e)
                     return {}
                 await asyncio.sleep(1)
         
@@ -54,15 +74,16 @@ class DeribitAnalyticsWithPagination:
     
     async def fetch_complete_options_trades(self, currency: str = "BTC", hours_back: int = 24, chunk_hours: int = 4) -> List[Dict]:
         """Fetch complete options trades using timestamp-based pagination"""
-        print(f"\n=== Fetching Complete {currency} Options Flow ({hours_back}h) ===")
+        logger.info("=== Fetching Complete %s Options Flow (%dh) ===", currency, hours_back)
         
         end_time = datetime.now()
         all_trades = []
         unique_trades = {}
         total_chunks = math.ceil(hours_back / chunk_hours)
         
-        print(f"Using {chunk_hours}h chunks, {total_chunks} total chunks needed")
-        
+        logger.info("Using %dh chunks, %d total chunks needed", chunk_hours, total_chunks)
+
+        zero_streak = 0
         for chunk_idx in range(total_chunks):
             chunk_start_hours = chunk_idx * chunk_hours
             chunk_end_hours = min((chunk_idx + 1) * chunk_hours, hours_back)
@@ -70,7 +91,9 @@ class DeribitAnalyticsWithPagination:
             chunk_end = end_time - timedelta(hours=chunk_start_hours)
             chunk_start = end_time - timedelta(hours=chunk_end_hours)
             
-            print(f"Chunk {chunk_idx + 1}/{total_chunks}: {chunk_start.strftime('%m/%d %H:%M')} to {chunk_end.strftime('%m/%d %H:%M')}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Chunk %d/%d: %s to %s", chunk_idx + 1, total_chunks,
+                            chunk_start.strftime('%m/%d %H:%M'), chunk_end.strftime('%m/%d %H:%M'))
             
             params = {
                 "currency": currency,
@@ -89,11 +112,11 @@ class DeribitAnalyticsWithPagination:
                 chunk_trades = result.get("trades", [])
                 has_more = result.get("has_more", False)
                 if has_more:
-                    print(f"  ⚠️  Chunk has more data (may need smaller chunks)")
+                    logger.warning("  Chunk has more data (may need smaller chunks)")
             elif isinstance(result, list):
                 chunk_trades = result
             
-            print(f"  Fetched {len(chunk_trades)} trades")
+            logger.info("  Fetched %d trades", len(chunk_trades))
             
             # Deduplicate by trade_id
             chunk_unique = 0
@@ -103,13 +126,24 @@ class DeribitAnalyticsWithPagination:
                     unique_trades[trade_id] = trade
                     chunk_unique += 1
             
-            print(f"  Added {chunk_unique} unique trades")
-            
+            logger.info("  Added %d unique trades", chunk_unique)
+
+            # In thin markets the earlier chunks already overlapped the whole
+            # window; once two consecutive chunks add nothing new, the rest
+            # of the tail won't either - skip those API calls entirely
+            if chunk_unique == 0:
+                zero_streak += 1
+                if zero_streak >= 2:
+                    logger.info("  No new trades in last 2 chunks - stopping early")
+                    break
+            else:
+                zero_streak = 0
+
             # Small delay to be nice to the API
             await asyncio.sleep(0.3)
         
         all_trades = list(unique_trades.values())
-        print(f"\nTotal unique trades collected: {len(all_trades)}")
+        logger.info("Total unique trades collected: %d", len(all_trades))
         
         # Analyze coverage
         if all_trades:
@@ -119,18 +153,25 @@ class DeribitAnalyticsWithPagination:
                 first_trade = datetime.fromtimestamp(timestamps[0] / 1000)
                 last_trade = datetime.fromtimestamp(timestamps[-1] / 1000)
                 coverage_hours = (last_trade - first_trade).total_seconds() / 3600
-                print(f"Coverage: {coverage_hours:.1f} hours ({coverage_hours/hours_back*100:.1f}%)")
-                print(f"Time range: {first_trade.strftime('%m/%d %H:%M')} to {last_trade.strftime('%m/%d %H:%M')}")
+                logger.info("Coverage: %.1f hours (%.1f%%)", coverage_hours, coverage_hours / hours_back * 100)
+                logger.info("Time range: %s to %s", first_trade.strftime('%m/%d %H:%M'), last_trade.strftime('%m/%d %H:%M'))
         
         return all_trades
     
     async def fetch_book_summary_by_currency(self, currency: str = "BTC") -> List[Dict]:
         """Fetch book summary for all instruments in a currency"""
+        cached = self._book_summary_cache.get(currency)
+        if cached and time.monotonic() - cached[0] < self.book_summary_ttl:
+            return cached[1]
+
         url = f"{self.base_url}/public/get_book_summary_by_currency"
         params = {"currency": currency, "kind": "option"}
-        
+
         result = await self.fetch_with_retry(url, params)
-        return result if isinstance(result, list) else []
+        book_data = result if isinstance(result, list) else []
+        if book_data:
+            self._book_summary_cache[currency] = (time.monotonic(), book_data)
+        return book_data
     
     async def fetch_futures_trades(self, currency: str = "BTC", hours_back: int = 24) -> List[Dict]:
         """Fetch historical futures trades for volume profile analysis"""
@@ -168,113 +209,132 @@ class DeribitAnalyticsWithPagination:
     
     async def fetch_index_price(self, currency: str = "BTC") -> float:
         """Fetch current index price"""
+        cached = self._index_price_cache.get(currency)
+        if cached and time.monotonic() - cached[0] < self.index_price_ttl:
+            return cached[1]
+
         url = f"{self.base_url}/public/get_index_price"
         params = {"index_name": f"{currency.lower()}_usd"}
-        
+
         result = await self.fetch_with_retry(url, params)
-        return result.get("index_price", 0)
+        price = result.get("index_price", 0)
+        if price > 0:
+            self._index_price_cache[currency] = (time.monotonic(), price)
+        return price
     
     def analyze_complete_options_flow(self, trades: List[Dict], spot_price: float) -> Dict[str, float]:
         """Analyze complete options flow with time-weighted analysis"""
         if not trades:
             return {}
         
-        print(f"Analyzing {len(trades)} options trades for flow patterns...")
-        
-        # Group trades by strike price and calculate comprehensive flow metrics
-        strike_flow = {}
-        total_volume = 0
+        logger.info("Analyzing %d options trades for flow patterns...", len(trades))
         
+        # Phase 1: parse trades into parallel columns (SoA)
+        # Neither value changes during the loop - computing them per trade
+        # costs a syscall plus strftime formatting on every iteration
+        now_ms = datetime.now().timestamp() * 1000
+        today_token = datetime.now().strftime("%d%b%y").upper()
+
+        strikes = []
+        is_call = []
+        amounts = []
+        prices = []
+        is_buy = []
+        is_0dte = []
+        timestamps = []
+
         for trade in trades:
-            try:
-                # Parse instrument name to extract strike and expiry
-                instrument = trade.get("instrument_name", "")
-                if not instrument:
-                    continue
-                
-                # Format: BTC-25SEP20-6000-P or BTC-25SEP20-6000-C
-                parts = instrument.split("-")
-                if len(parts) < 4:
-                    continue
-                
-                strike = float(parts[2])
-                option_type = parts[3]  # P or C
-                expiry_str = parts[1]
-                
-                amount = trade.get("amount", 0)
-                price = trade.get("price", 0)
-                direction = trade.get("direction", "")
-                timestamp = trade.get("timestamp", 0)
-                
-                if amount <= 0 or price <= 0:
-                    continue
-                
-                # Calculate notional value (premium paid)
-                notional = amount * price * spot_price  # Convert to USD
-                total_volume += notional
-                
-                # Time weighting - more recent trades weighted higher
-                hours_ago = (datetime.now().timestamp() * 1000 - timestamp) / (1000 * 3600)
-                time_weight = math.exp(-hours_ago / 8)  # 8-hour half-life
-                
-                # Calculate delta-adjusted exposure
-                moneyness = spot_price / strike
-                if option_type == "C":  # Call
-                    approx_delta = max(0.05, min(0.95, 0.5 + 0.4 * (moneyness - 1)))
-                else:  # Put
-                    approx_delta = max(0.05, min(0.95, 0.5 - 0.4 * (moneyness - 1)))
-                
-                delta_exposure = notional * approx_delta
-                
-                # Flow direction (positive = buying pressure, negative = selling pressure)
-                flow_direction = 1 if direction == "buy" else -1
-                
-                # Check if it's 0DTE (today's expiry)
-                today = datetime.now().strftime("%d%b%y").upper()
-                is_0dte = expiry_str == today
-                
-                if strike not in strike_flow:
-                    strike_flow[strike] = {
-                        "total_volume": 0,
-                        "net_flow": 0,
-                        "call_volume": 0,
-                        "put_volume": 0,
-                        "weighted_flow": 0,
-                        "call_flow": 0,
-                        "put_flow": 0,
-                        "dte_0_volume": 0,
-                        "dte_0_call_volume": 0,
-                        "dte_0_put_volume": 0,
-                        "trade_count": 0
-                    }
-                
-                data = strike_flow[strike]
-                data["total_volume"] += notional
-                data["net_flow"] += delta_exposure * flow_direction
-                data["weighted_flow"] += delta_exposure * flow_direction * time_weight
-                data["trade_count"] += 1
-                
-                if option_type == "C":
-                    data["call_volume"] += notional
-                    data["call_flow"] += delta_exposure * flow_direction
-                    if is_0dte:
-                        data["dte_0_call_volume"] += notional
-                else:
-                    data["put_volume"] += notional
-                    data["put_flow"] += delta_exposure * flow_direction
-                    if is_0dte:
-                        data["dte_0_put_volume"] += notional
-                
-                if is_0dte:
-                    data["dte_0_volume"] += notional
-                    
-            except (ValueError, IndexError) as e:
+            # Validate the instrument name in one regex match instead of
+            # wrapping the body in try/except for malformed rows
+            m = _INSTR_RE.match(trade.get("instrument_name", ""))
+            if not m:
                 continue
-        
+
+            amount = trade.get("amount", 0)
+            price = trade.get("price", 0)
+
+            if amount <= 0 or price <= 0:
+                continue
+
+            strikes.append(int(m.group(3)))
+            is_call.append(m.group(4) == "C")
+            is_0dte.append(m.group(2) == today_token)
+            amounts.append(amount)
+            prices.append(price)
+            is_buy.append(trade.get("direction", "") == "buy")
+            timestamps.append(trade.get("timestamp", 0))
+
+        if not strikes:
+            return {}
+
+        # Phase 2: vectorized per-trade math - one np.exp over the whole
+        # timestamp column instead of a math.exp call per trade
+        strike_arr = np.asarray(strikes)
+        call_mask = np.asarray(is_call)
+        dte0_mask = np.asarray(is_0dte)
+        buy_mask = np.asarray(is_buy)
+
+        notional = np.asarray(amounts) * np.asarray(prices) * spot_price  # USD premium
+        total_volume = float(notional.sum())
+
+        # Time weighting - more recent trades weighted higher (8-hour half-life)
+        hours_ago = (now_ms - np.asarray(timestamps, dtype=np.float64)) / (1000 * 3600)
+        time_weight = np.exp(-hours_ago / 8)
+
+        # Delta heuristic as one linear op + clip instead of per-trade branches
+        moneyness = spot_price / strike_arr
+        sign = np.where(call_mask, 1.0, -1.0)
+        approx_delta = np.clip(0.5 + sign * 0.4 * (moneyness - 1.0), 0.05, 0.95)
+
+        delta_exposure = notional * approx_delta
+        flow_direction = np.where(buy_mask, 1.0, -1.0)
+        signed_flow = delta_exposure * flow_direction
+        weighted_flow = signed_flow * time_weight
+
+        # Phase 3: aggregate flow metrics per strike with masked bincounts -
+        # one C pass per field instead of a Python loop boxing numpy scalars
+        unique_strikes, idx = np.unique(strike_arr, return_inverse=True)
+        n_strikes = unique_strikes.size
+        put_mask = ~call_mask
+
+        def per_strike(weights=None):
+            return np.bincount(idx, weights=weights, minlength=n_strikes)
+
+        total_vol_col = per_strike(notional)
+        net_flow_col = per_strike(signed_flow)
+        weighted_flow_col = per_strike(weighted_flow)
+        trade_count_col = per_strike()
+        call_vol_col = per_strike(notional * call_mask)
+        put_vol_col = per_strike(notional * put_mask)
+        call_flow_col = per_strike(signed_flow * call_mask)
+        put_flow_col = per_strike(signed_flow * put_mask)
+        dte0_vol_col = per_strike(notional * dte0_mask)
+        dte0_call_vol_col = per_strike(notional * (call_mask & dte0_mask))
+        dte0_put_vol_col = per_strike(notional * (put_mask & dte0_mask))
+
+        # Materialize the per-strike dict only at the aggregated size
+        # (hundreds of strikes, not tens of thousands of trades)
+        strike_flow = {
+            int(strike): {
+                "total_volume": float(total_vol_col[i]),
+                "net_flow": float(net_flow_col[i]),
+                "call_volume": float(call_vol_col[i]),
+                "put_volume": float(put_vol_col[i]),
+                "weighted_flow": float(weighted_flow_col[i]),
+                "call_flow": float(call_flow_col[i]),
+                "put_flow": float(put_flow_col[i]),
+                "dte_0_volume": float(dte0_vol_col[i]),
+                "dte_0_call_volume": float(dte0_call_vol_col[i]),
+                "dte_0_put_volume": float(dte0_put_vol_col[i]),
+                "trade_count": int(trade_count_col[i])
+            }
+            for i, strike in enumerate(unique_strikes)
+        }
+
         if not strike_flow:
             return {}
         
-        print(f"Processed ${total_volume:,.0f} in total options volume across {len(strike_flow)} strikes")
+        logger.info("Processed $%.0f in total options volume across %d strikes", total_volume, len(strike_flow))
         
         # Calculate comprehensive flow levels
         levels = {}
@@ -292,8 +352,7 @@ class DeribitAnalyticsWithPagination:
                 balanced_strikes.append((strike, balance_ratio, data["total_volume"]))
         
         if balanced_strikes:
-            balanced_strikes.sort(key=lambda x: (x[1], x[2]), reverse=True)
-            levels["Max Pain Flow"] = balanced_strikes[0][0]
+            levels["Max Pain Flow"] = max(balanced_strikes, key=lambda x: (x[1], x[2]))[0]
         
         # 3. Call Flow Resistance - strike above spot with highest net call buying
         call_resistance_strikes = [
@@ -302,8 +361,7 @@ class DeribitAnalyticsWithPagination:
             if strike > spot_price and data["call_flow"] > 0
         ]
         if call_resistance_strikes:
-            call_resistance_strikes.sort(key=lambda x: x[1], reverse=True)
-            levels["Call Flow Resistance"] = call_resistance_strikes[0][0]
+            levels["Call Flow Resistance"] = max(call_resistance_strikes, key=lambda x: x[1])[0]
         
         # 4. Put Flow Support - strike below spot with highest net put buying
         put_support_strikes = [
@@ -312,8 +370,7 @@ class DeribitAnalyticsWithPagination:
             if strike < spot_price and data["put_flow"] < 0  # Negative put flow = put buying
         ]
         if put_support_strikes:
-            put_support_strikes.sort(key=lambda x: x[1], reverse=True)
-            levels["Put Flow Support"] = put_support_strikes[0][0]
+            levels["Put Flow Support"] = max(put_support_strikes, key=lambda x: x[1])[0]
         
         # 5. 0DTE Flow Levels
         dte_0_call_strikes = [
@@ -322,8 +379,7 @@ class DeribitAnalyticsWithPagination:
             if strike > spot_price and data["dte_0_call_volume"] > 0
         ]
         if dte_0_call_strikes:
-            dte_0_call_strikes.sort(key=lambda x: x[1], reverse=True)
-            levels["Call Flow Resistance 0DTE"] = dte_0_call_strikes[0][0]
+            levels["Call Flow Resistance 0DTE"] = max(dte_0_call_strikes, key=lambda x: x[1])[0]
         
         dte_0_put_strikes = [
             (strike, data["dte_0_put_volume"]) 
@@ -331,8 +387,7 @@ class DeribitAnalyticsWithPagination:
             if strike < spot_price and data["dte_0_put_volume"] > 0
         ]
         if dte_0_put_strikes:
-            dte_0_put_strikes.sort(key=lambda x: x[1], reverse=True)
-            levels["Put Flow Support 0DTE"] = dte_0_put_strikes[0][0]
+            levels["Put Flow Support 0DTE"] = max(dte_0_put_strikes, key=lambda x: x[1])[0]
         
         # 6. Volume-Weighted Average Strike (VWAS)
         if total_volume > 0:
@@ -353,146 +408,132 @@ class DeribitAnalyticsWithPagination:
         """Calculate volume profile from futures trades"""
         if not trades:
             return {}
-        
-        # Group trades by price level
-        price_levels = {}
-        
-        for trade in trades:
-            price = trade.get("price", 0)
-            amount = trade.get("amount", 0)
-            
-            # Round price to create levels
-            if price > 1000:  # BTC-like prices
-                level = round(price / 10) * 10
-            else:  # ETH-like prices
-                level = round(price)
-            
-            if level not in price_levels:
-                price_levels[level] = 0
-            
-            price_levels[level] += amount
-        
-        if not price_levels:
+
+        # Columnar pass: quantize every price and sum volume per bucket with
+        # bincount instead of hashing into a dict per trade
+        n = len(trades)
+        prices = np.fromiter((t.get("price", 0) for t in trades), dtype=np.float64, count=n)
+        amounts = np.fromiter((t.get("amount", 0) for t in trades), dtype=np.float64, count=n)
+
+        valid = prices > 0
+        if not valid.any():
             return {}
-        
+        prices = prices[valid]
+        amounts = amounts[valid]
+
+        # $10 buckets for BTC-like prices, $1 for ETH-like - same rule as before
+        step = 10.0 if prices.max() > 1000 else 1.0
+        levels = np.round(prices / step).astype(np.int64)
+
+        unique_levels, inverse = np.unique(levels, return_inverse=True)
+        level_volumes = np.bincount(inverse, weights=amounts)
+
         # Find high volume level (HVL)
-        max_volume_level = max(price_levels.items(), key=lambda x: x[1])
-        
+        hvl_idx = level_volumes.argmax()
+
         return {
-            "HVL": max_volume_level[0],
-            "HVL_Volume": max_volume_level[1]
+            "HVL": float(unique_levels[hvl_idx] * step),
+            "HVL_Volume": float(level_volumes[hvl_idx])
         }
     
     def calculate_1d_max_min(self, trades: List[Dict]) -> Dict[str, float]:
         """Calculate 1D max/min from futures trades"""
         if not trades:
             return {}
-        
-        prices = [trade.get("price", 0) for trade in trades if trade.get("price", 0) > 0]
-        
-        if not prices:
+
+        # fromiter consumes the generator once into a flat array; min/max on
+        # that beats building a list and scanning it twice
+        prices = np.fromiter(
+            (p for trade in trades if (p := trade.get("price", 0)) > 0),
+            dtype=np.float64
+        )
+
+        if prices.size == 0:
             return {}
-        
+
         return {
-            "1D Max": max(prices),
-            "1D Min": min(prices)
+            "1D Max": float(prices.max()),
+            "1D Min": float(prices.min())
         }
     
     def calculate_open_interest_levels(self, book_data: List[Dict], spot_price: float) -> Dict[str, float]:
         """Calculate support/resistance levels from open interest"""
         if not book_data:
             return {}
-        
-        # Group by strike and calculate total open interest
-        strike_oi = {}
+
+        # Phase 1: parse instruments into parallel columns
+        strikes = []
+        is_call = []
+        is_0dte = []
+        oi_values = []
         today = datetime.now().strftime("%d%b%y").upper()
-        
+
         for instrument in book_data:
-            try:
-                name = instrument.get("instrument_name", "")
-                if not name:
-                    continue
-                
-                parts = name.split("-")
-                if len(parts) < 4:
-                    continue
-                
-                strike = float(parts[2])
-                option_type = parts[3]
-                expiry = parts[1]
-                
-                open_interest = instrument.get("open_interest", 0)
-                if open_interest <= 0:
-                    continue
-                
-                if strike not in strike_oi:
-                    strike_oi[strike] = {
-                        "total_oi": 0,
-                        "call_oi": 0,
-                        "put_oi": 0,
-                        "dte_0_oi": 0
-                    }
-                
-                strike_oi[strike]["total_oi"] += open_interest
-                
-                if option_type == "C":
-                    strike_oi[strike]["call_oi"] += open_interest
-                else:
-                    strike_oi[strike]["put_oi"] += open_interest
-                
-                # Check if it's 0DTE
-                if expiry == today:
-                    strike_oi[strike]["dte_0_oi"] += open_interest
-                    
-            except (ValueError, IndexError):
+            # Same regex pre-filter as the flow analysis - no try/except
+            m = _INSTR_RE.match(instrument.get("instrument_name", ""))
+            if not m:
                 continue
-        
-        if not strike_oi:
+
+            open_interest = instrument.get("open_interest", 0)
+            if open_interest <= 0:
+                continue
+
+            strikes.append(int(m.group(3)))
+            is_call.append(m.group(4) == "C")
+            is_0dte.append(m.group(2) == today)
+            oi_values.append(open_interest)
+
+        if not strikes:
             return {}
-        
+
+        # Phase 2: aggregate OI per strike with bincount, same group-by
+        # pattern as the vectorized flow analysis
+        strike_arr = np.asarray(strikes)
+        oi = np.asarray(oi_values, dtype=np.float64)
+        call_mask = np.asarray(is_call)
+        dte0_mask = np.asarray(is_0dte)
+
+        unique_strikes, idx = np.unique(strike_arr, return_inverse=True)
+        n_strikes = unique_strikes.size
+        call_oi = np.bincount(idx, weights=oi * call_mask, minlength=n_strikes)
+        put_oi = np.bincount(idx, weights=oi * ~call_mask, minlength=n_strikes)
+        dte0_oi = np.bincount(idx, weights=oi * dte0_mask, minlength=n_strikes)
+
         levels = {}
-        
+
         # Call Resistance - highest call OI above spot
-        call_strikes = [(strike, data["call_oi"]) for strike, data in strike_oi.items() 
-                       if strike > spot_price and data["call_oi"] > 0]
-        if call_strikes:
-            call_strikes.sort(key=lambda x: x[1], reverse=True)
-            levels["Call Resistance"] = call_strikes[0][0]
-        
+        above = (unique_strikes > spot_price) & (call_oi > 0)
+        if above.any():
+            levels["Call Resistance"] = int(unique_strikes[above][call_oi[above].argmax()])
+
         # Put Support - highest put OI below spot
-        put_strikes = [(strike, data["put_oi"]) for strike, data in strike_oi.items() 
-                      if strike < spot_price and data["put_oi"] > 0]
-        if put_strikes:
-            put_strikes.sort(key=lambda x: x[1], reverse=True)
-            levels["Put Support"] = put_strikes[0][0]
-        
+        below = (unique_strikes < spot_price) & (put_oi > 0)
+        if below.any():
+            levels["Put Support"] = int(unique_strikes[below][put_oi[below].argmax()])
+
         # Gamma Wall 0DTE - highest 0DTE OI
-        dte_0_strikes = [(strike, data["dte_0_oi"]) for strike, data in strike_oi.items() 
-                        if data["dte_0_oi"] > 0]
-        if dte_0_strikes:
-            dte_0_strikes.sort(key=lambda x: x[1], reverse=True)
-            levels["Gamma Wall 0DTE"] = dte_0_strikes[0][0]
-        
+        if dte0_oi.max() > 0:
+            levels["Gamma Wall 0DTE"] = int(unique_strikes[dte0_oi.argmax()])
+
         return levels
     
     async def get_complete_analysis(self, currency: str = "BTC") -> Dict[str, any]:
         """Get complete analytics with full options flow coverage"""
-        print(f"\n=== Complete {currency} Analysis ===")
-        
-        # Fetch spot price
-        spot_price = await self.fetch_index_price(currency)
-        print(f"Current {currency} price: ${spot_price:,.2f}")
-        
-        # Fetch complete options trades with pagination
-        options_trades = await self.fetch_complete_options_trades(currency, 24, 4)
-        
-        # Fetch other data in parallel
-        book_data, futures_trades = await asyncio.gather(
+        logger.info("=== Complete %s Analysis ===", currency)
+        
+        # All four fetches are independent - the spot price isn't needed until
+        # the analysis step below, so fire everything at once and wall time
+        # becomes the slowest fetch rather than the sum
+        spot_price, options_trades, book_data, futures_trades = await asyncio.gather(
+            self.fetch_index_price(currency),
+            self.fetch_complete_options_trades(currency, 24, 4),
             self.fetch_book_summary_by_currency(currency),
             self.fetch_futures_trades(currency)
         )
-        
-        print(f"Data summary: {len(options_trades)} options trades, {len(book_data)} instruments, {len(futures_trades)} futures trades")
+        logger.info("Current %s price: $%.2f", currency, spot_price)
+
+        logger.info("Data summary: %d options trades, %d instruments, %d futures trades",
+                    len(options_trades), len(book_data), len(futures_trades))
         
         # Calculate all levels
         flow_levels = self.analyze_complete_options_flow(options_trades, spot_price)
@@ -552,4 +593,5 @@ async def test_complete_analytics():
                 print(f"{level_name}: {level_data}")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     asyncio.run(test_complete_analytics()) 
\ No newline at end of file
@@ -6,53 +6,122 @@ Compares 1000-trade limit vs complete pagination to see what we're missing
 
 import asyncio
 import aiohttp
+import bisect
+import contextlib
+import io
+import orjson
 import math
+import numpy as np
+import yarl
+import _http
+from aiolimiter import AsyncLimiter
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import List, Dict
 
+@dataclass(slots=True)
+class Trade:
+    """Slim trade record - a slotted instance is ~4x smaller than the
+    raw ~10-key response dict, which matters when holding 50k trades"""
+    trade_id: str
+    timestamp: int
+    price: float
+    amount: float
+    instrument_name: str = ""
+
+class BloomFilter:
+    """Minimal Bloom filter for trade-id dedup: answers "definitely new"
+    with a few bit probes instead of hashing into the full seen-ids set.
+    False positives are possible, so callers confirm hits exactly."""
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        # Standard sizing: m = -n*ln(p)/ln(2)^2 bits, k = (m/n)*ln(2) hashes
+        num_bits = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.num_bits = max(num_bits, 8)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _indexes(self, item):
+        # Double hashing: h1 + i*h2 gives k independent-enough probes
+        h1 = hash(item)
+        h2 = hash((item, 0x9E3779B9))
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item):
+        for idx in self._indexes(item):
+            self.bits[idx >> 3] |= 1 << (idx & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[idx >> 3] & (1 << (idx & 7)) for idx in self._indexes(item))
+
+def to_trades(raw_trades: List[Dict]) -> List[Trade]:
+    """Convert raw Deribit trade dicts into slim Trade records"""
+    return [
+        Trade(
+            t.get("trade_id"),
+            t.get("timestamp", 0),
+            t.get("price", 0),
+            t.get("amount", 0),
+            t.get("instrument_name", "")
+        )
+        for t in raw_trades
+    ]
+
 class FuturesPaginationTest:
     """Test futures data coverage with and without pagination"""
     
-    def __init__(self):
+    def __init__(self, session: aiohttp.ClientSession = None):
         self.base_url = "https://www.deribit.com/api/v2"
-        self.session = None
-        
+        # An externally provided session (see _http.get_session) is shared
+        # with other scripts and must outlive this tester
+        self.session = session
+        self._owns_session = session is None
+
     async def __aenter__(self):
-        timeout = aiohttp.ClientTimeout(total=30)
-        self.session = aiohttp.ClientSession(timeout=timeout)
+        if self.session is None:
+            self.session = _http.make_session()
+            self._owns_session = True
+        # Token bucket keeps concurrent chunk fetches under Deribit's rate limit
+        self.limiter = AsyncLimiter(5, 1)
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
     
     def prepare_params(self, params: Dict) -> Dict:
         """Convert parameters to string format for aiohttp"""
-        prepared = {}
-        for key, value in params.items():
-            if isinstance(value, bool):
-                prepared[key] = "true" if value else "false"
-            else:
-                prepared[key] = str(value)
-        return prepared
-    
+        return {
+            key: ("true" if value is True else "false" if value is False else str(value))
+            for key, value in params.items()
+        }
+
     async def fetch_with_retry(self, url: str, params: Dict = None, max_retries: int = 3) -> Dict:
         """Fetch data with retry logic"""
+        # The params never change between attempts - stringify them once
+        prepared_params = self.prepare_params(params) if params else {}
+
         for attempt in range(max_retries):
             try:
-                await asyncio.sleep(0.2)  # Rate limiting
-                
-                prepared_params = self.prepare_params(params) if params else {}
-                async with self.session.get(url, params=prepared_params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get("result", data)
-                    elif response.status == 429:
-                        wait_time = 2 ** attempt
-                        print(f"Rate limited, waiting {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                    else:
-                        print(f"HTTP {response.status} for {url}")
+                # Token bucket only blocks at saturation, unlike a fixed sleep
+                async with self.limiter:
+                    async with self.session.get(url, params=prepared_params or None) as response:
+                        if response.status == 200:
+                            # orjson parses the dense trade arrays several times faster than stdlib json
+                            data = orjson.loads(await response.read())
+                            return data.get("result", data)
+                        elif response.status == 429:
+                            # Honor the server's backoff hint when present
+                            retry_after = response.headers.get("Retry-After")
+                            wait_time = float(retry_after) if retry_after else 2 ** attempt
+                            print(f"Rate limited, waiting {wait_time}s...")
+                            # Drain the shared bucket so concurrent fetchers
+                            # also pause instead of piling on more 429s
+                            self.limiter._level = self.limiter.max_rate
+                            await asyncio.sleep(wait_time)
+                        else:
+                            print(f"HTTP {response.status} for {url}")
                         
             except Exception as e:
                 print(f"Attempt {attempt + 1} failed for {url}: {e}")
@@ -62,7 +131,7 @@ class FuturesPaginationTest:
         
         return {}
     
-    async def fetch_futures_standard(self, currency: str = "BTC", hours_back: int = 24) -> List[Dict]:
+    async def fetch_futures_standard(self, currency: str = "BTC", hours_back: int = 24) -> List[Trade]:
         """Standard futures fetch (limited to 1000 trades)"""
         print(f"\n=== Standard Futures Fetch ({currency}) ===")
         
@@ -71,7 +140,10 @@ class FuturesPaginationTest:
             "currency": currency,
             "kind": "future",
             "count": 1000,
-            "include_old": True
+            "include_old": True,
+            # Pin the order - the binary-search cutoff below depends on
+            # newest-first, and the API's default order is unspecified
+            "sorting": "desc"
         }
         
         result = await self.fetch_with_retry(url, params)
@@ -87,79 +159,125 @@ class FuturesPaginationTest:
             return []
         
         print(f"Fetched {len(trades)} total trades")
-        
-        # Filter trades from the last N hours
+
+        trades = to_trades(trades)
+
+        # Filter trades from the last N hours. Deribit returns trades
+        # newest-first, so binary-search the cutoff and slice instead of
+        # testing all 1000 timestamps in Python
         cutoff_time = datetime.now() - timedelta(hours=hours_back)
         cutoff_timestamp = int(cutoff_time.timestamp() * 1000)
-        
-        filtered_trades = []
-        for trade in trades:
-            if trade.get("timestamp", 0) >= cutoff_timestamp:
-                filtered_trades.append(trade)
-        
+
+        timestamps_view = [trade.timestamp for trade in trades]
+        # Negate to search the descending list as ascending; bisect_right
+        # keeps trades exactly at the cutoff, matching the old >= filter
+        idx = bisect.bisect_right(timestamps_view, -cutoff_timestamp, key=lambda ts: -ts)
+        filtered_trades = trades[:idx]
+
         print(f"Filtered to {len(filtered_trades)} recent trades (last {hours_back}h)")
         return filtered_trades
     
-    async def fetch_futures_paginated(self, currency: str = "BTC", hours_back: int = 24, chunk_hours: int = 4) -> List[Dict]:
+    async def fetch_futures_paginated(self, currency: str = "BTC", hours_back: int = 24, chunk_hours: int = 4) -> List[Trade]:
         """Paginated futures fetch (complete coverage)"""
         print(f"\n=== Paginated Futures Fetch ({currency}) ===")
         
         end_time = datetime.now()
-        all_trades = []
-        unique_trades = {}
         total_chunks = math.ceil(hours_back / chunk_hours)
-        
+
         print(f"Using {chunk_hours}h chunks, {total_chunks} total chunks needed")
-        
+
+        # Build all chunk windows up front - they are independent, so fetch
+        # them concurrently under a bounded semaphore + shared rate limiter
+        chunk_windows = []
         for chunk_idx in range(total_chunks):
             chunk_start_hours = chunk_idx * chunk_hours
             chunk_end_hours = min((chunk_idx + 1) * chunk_hours, hours_back)
-            
-            chunk_end = end_time - timedelta(hours=chunk_start_hours)
-            chunk_start = end_time - timedelta(hours=chunk_end_hours)
-            
-            print(f"Chunk {chunk_idx + 1}/{total_chunks}: {chunk_start.strftime('%m/%d %H:%M')} to {chunk_end.strftime('%m/%d %H:%M')}")
-            
-            params = {
-                "currency": currency,
-                "kind": "future",
-                "start_timestamp": int(chunk_start.timestamp() * 1000),
-                "end_timestamp": int(chunk_end.timestamp() * 1000),
-                "count": 1000,
-                "sorting": "desc"
-            }
-            
-            url = f"{self.base_url}/public/get_last_trades_by_currency_and_time"
-            result = await self.fetch_with_retry(url, params)
-            
+            chunk_windows.append((
+                end_time - timedelta(hours=chunk_end_hours),
+                end_time - timedelta(hours=chunk_start_hours)
+            ))
+
+        semaphore = asyncio.Semaphore(4)
+
+        # Only the timestamps vary between chunks - bake the fixed query keys
+        # into the URL once instead of re-stringifying them per request
+        base_url = yarl.URL(f"{self.base_url}/public/get_last_trades_by_currency_and_time").with_query({
+            "currency": currency,
+            "kind": "future",
+            "count": "1000",
+            "sorting": "desc"
+        })
+
+        async def fetch_range(chunk_start: datetime, chunk_end: datetime, depth: int = 0) -> List[Trade]:
+            """Fetch one time window, recursively splitting at the midpoint
+            while the API reports more data than the 1000-trade cap returns"""
+            # fetch_with_retry holds the rate limiter; only bound concurrency here
+            async with semaphore:
+                print(f"Range {chunk_start.strftime('%m/%d %H:%M')} to {chunk_end.strftime('%m/%d %H:%M')} (depth {depth})")
+
+                chunk_url = base_url.update_query(
+                    start_timestamp=str(int(chunk_start.timestamp() * 1000)),
+                    end_timestamp=str(int(chunk_end.timestamp() * 1000))
+                )
+                result = await self.fetch_with_retry(chunk_url)
+
             chunk_trades = []
+            has_more = False
             if isinstance(result, dict):
                 chunk_trades = result.get("trades", [])
                 has_more = result.get("has_more", False)
-                if has_more:
-                    print(f"  ⚠️  Chunk has more data (may need smaller chunks)")
             elif isinstance(result, list):
                 chunk_trades = result
-            
+
+            if has_more and depth < 4:
+                # Dense window: re-fetch both halves so data isn't dropped,
+                # without shrinking the chunk size globally
+                mid = chunk_start + (chunk_end - chunk_start) / 2
+                print(f"  ⚠️  Range has more data - splitting at {mid.strftime('%m/%d %H:%M')}")
+                first_half, second_half = await asyncio.gather(
+                    fetch_range(chunk_start, mid, depth + 1),
+                    fetch_range(mid, chunk_end, depth + 1)
+                )
+                return first_half + second_half
+
+            if has_more:
+                print(f"  ⚠️  Range still has more data at max split depth")
+
             print(f"  Fetched {len(chunk_trades)} trades")
-            
-            # Deduplicate by trade_id
+            # Drop the bulky response dicts as early as possible
+            return to_trades(chunk_trades)
+
+        chunk_results = await asyncio.gather(
+            *[fetch_range(start, end) for start, end in chunk_windows]
+        )
+
+        # Merge and deduplicate by trade_id after all chunks return. Ids are
+        # almost all new (dups only appear at chunk boundaries), so a Bloom
+        # filter handles the common "definitely new" case with a few bit
+        # probes; only its maybe-hits fall through to the exact set check
+        bloom = BloomFilter()
+        seen_ids = set()
+        all_trades = []
+        for chunk_trades in chunk_results:
             chunk_unique = 0
             for trade in chunk_trades:
-                trade_id = trade.get("trade_id")
-                if trade_id and trade_id not in unique_trades:
-                    unique_trades[trade_id] = trade
-                    chunk_unique += 1
-            
+                trade_id = trade.trade_id
+                if trade_id is None:
+                    continue
+                if trade_id in bloom and trade_id in seen_ids:
+                    continue
+                bloom.add(trade_id)
+                seen_ids.add(trade_id)
+                all_trades.append(trade)
+                chunk_unique += 1
+
             print(f"  Added {chunk_unique} unique trades")
-            await asyncio.sleep(0.3)  # Be nice to the API
-        
-        all_trades = list(unique_trades.values())
+
         print(f"\nTotal unique trades collected: {len(all_trades)}")
         
         # Analyze coverage
         if all_trades:
-            timestamps = [trade.get("timestamp", 0) for trade in all_trades if trade.get("timestamp", 0) > 0]
+            timestamps = [trade.timestamp for trade in all_trades if trade.timestamp > 0]
             if timestamps:
                 timestamps.sort()
                 first_trade = datetime.fromtimestamp(timestamps[0] / 1000)
@@ -169,65 +287,71 @@ class FuturesPaginationTest:
         
         return all_trades
     
-    def analyze_volume_profile(self, trades: List[Dict], label: str) -> Dict:
+    def analyze_volume_profile(self, trades: List[Trade], label: str) -> Dict:
         """Analyze volume profile from trades"""
         if not trades:
             return {}
-        
+
         print(f"\n--- {label} Volume Profile Analysis ---")
-        
-        # Group trades by price level
-        price_levels = {}
-        total_volume = 0
-        
-        for trade in trades:
-            price = trade.get("price", 0)
-            amount = trade.get("amount", 0)
-            
-            if price <= 0 or amount <= 0:
-                continue
-            
-            # Round price to create levels
-            if price > 1000:  # BTC-like prices
-                level = round(price / 10) * 10
-            else:  # ETH-like prices
-                level = round(price)
-            
-            if level not in price_levels:
-                price_levels[level] = 0
-            
-            price_levels[level] += amount
-            total_volume += amount
-        
-        if not price_levels:
+
+        # Pull prices/amounts into NumPy arrays up front - the per-trade
+        # Python loop dominates once the paginated path returns 10k+ trades
+        n = len(trades)
+        prices = np.fromiter((t.price for t in trades), dtype=np.float64, count=n)
+        amounts = np.fromiter((t.amount for t in trades), dtype=np.float64, count=n)
+
+        valid = (prices > 0) & (amounts > 0)
+        valid_prices = prices[valid]
+        valid_amounts = amounts[valid]
+
+        if valid_prices.size == 0:
             return {}
-        
-        # Find top volume levels
-        sorted_levels = sorted(price_levels.items(), key=lambda x: x[1], reverse=True)
-        top_5_levels = sorted_levels[:5]
-        
+
+        # Round prices to levels: $10 buckets for BTC-like, $1 for ETH-like.
+        # Batches are almost always uniformly one side of $1000, so hoist
+        # the bucket choice; np.where only runs for genuinely mixed batches
+        pmin = float(valid_prices.min())
+        pmax = float(valid_prices.max())
+        if pmin > 1000:
+            levels = np.round(valid_prices / 10) * 10
+        elif pmax <= 1000:
+            levels = np.round(valid_prices)
+        else:
+            levels = np.where(valid_prices > 1000, np.round(valid_prices / 10) * 10, np.round(valid_prices))
+
+        # Aggregate volume per level in C
+        unique_levels, inverse = np.unique(levels, return_inverse=True)
+        level_volumes = np.bincount(inverse, weights=valid_amounts)
+        total_volume = float(valid_amounts.sum())
+
+        # Find top volume levels - argpartition selects the top k in O(N),
+        # then only those k get sorted for display
+        k = min(5, unique_levels.size)
+        top_idx = np.argpartition(level_volumes, -k)[-k:]
+        top_idx = top_idx[np.argsort(level_volumes[top_idx])[::-1]]
+        top_5_levels = [(float(unique_levels[i]), float(level_volumes[i])) for i in top_idx]
+
         print(f"Total Volume: {total_volume:,.2f}")
-        print(f"Price Levels: {len(price_levels)}")
+        print(f"Price Levels: {unique_levels.size}")
         print(f"Top 5 Volume Levels:")
         for i, (price, volume) in enumerate(top_5_levels, 1):
             pct = (volume / total_volume) * 100
             print(f"  {i}. ${price:,.0f}: {volume:,.2f} ({pct:.1f}%)")
-        
-        # Calculate price range and distribution
-        prices = [trade.get("price", 0) for trade in trades if trade.get("price", 0) > 0]
-        if prices:
-            price_range = max(prices) - min(prices)
-            avg_price = sum(prices) / len(prices)
-            print(f"Price Range: ${min(prices):,.2f} - ${max(prices):,.2f} (${price_range:,.2f})")
-            print(f"Average Price: ${avg_price:,.2f}")
-        
+
+        # Price range and distribution come from the same filtered column
+        # the aggregation used - no second masking pass over the prices
+        price_range = pmax - pmin
+        avg_price = float(valid_prices.mean())
+        print(f"Price Range: ${pmin:,.2f} - ${pmax:,.2f} (${price_range:,.2f})")
+        print(f"Average Price: ${avg_price:,.2f}")
+
         return {
             "total_volume": total_volume,
-            "price_levels": len(price_levels),
+            "price_levels": int(unique_levels.size),
             "hvl_price": top_5_levels[0][0] if top_5_levels else 0,
             "hvl_volume": top_5_levels[0][1] if top_5_levels else 0,
-            "price_range": price_range if prices else 0,
-            "avg_price": avg_price if prices else 0,
+            "price_range": price_range,
+            "avg_price": avg_price,
             "top_levels": top_5_levels
         }
     
@@ -296,34 +420,57 @@ class FuturesPaginationTest:
         if level_diff > 10:
             print(f"   🟡 Significant price level coverage gaps")
 
+async def analyze_currency(tester: FuturesPaginationTest, currency: str):
+    """Run the full standard-vs-paginated comparison for one currency"""
+    try:
+        # Test both approaches
+        standard_trades = await tester.fetch_futures_standard(currency, hours_back=24)
+        paginated_trades = await tester.fetch_futures_paginated(currency, hours_back=24, chunk_hours=4)
+
+        # The analysis below is synchronous - buffer its output and flush
+        # atomically so concurrent currencies don't interleave their reports
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            print(f"\n{'='*60}")
+            print(f"Testing {currency} Futures Data Coverage")
+            print(f"{'='*60}")
+
+            # Analyze volume profiles
+            standard_analysis = tester.analyze_volume_profile(standard_trades, "Standard (1000 limit)")
+            paginated_analysis = tester.analyze_volume_profile(paginated_trades, "Paginated (complete)")
+
+            # Compare results
+            tester.compare_datasets(standard_analysis, paginated_analysis, currency)
+
+        print(buffer.getvalue(), end="")
+
+    except Exception as e:
+        print(f"❌ Error testing {currency}: {e}")
+        import traceback
+        traceback.print_exc()
+
 async def test_futures_pagination():
     """Test futures data with and without pagination"""
     print("=" * 80)
     print("🚀 Testing Futures Data: Standard vs Paginated")
     print("=" * 80)
-    
-    async with FuturesPaginationTest() as tester:
-        for currency in ["BTC", "ETH"]:
-            try:
-                print(f"\n{'='*60}")
-                print(f"Testing {currency} Futures Data Coverage")
-                print(f"{'='*60}")
-                
-                # Test both approaches
-                standard_trades = await tester.fetch_futures_standard(currency, hours_back=24)
-                paginated_trades = await tester.fetch_futures_paginated(currency, hours_back=24, chunk_hours=4)
-                
-                # Analyze volume profiles
-                standard_analysis = tester.analyze_volume_profile(standard_trades, "Standard (1000 limit)")
-                paginated_analysis = tester.analyze_volume_profile(paginated_trades, "Paginated (complete)")
-                
-                # Compare results
-                tester.compare_datasets(standard_analysis, paginated_analysis, currency)
-                
-            except Exception as e:
-                print(f"❌ Error testing {currency}: {e}")
-                import traceback
-                traceback.print_exc()
+
+    # Use the shared session so runs alongside the other test scripts reuse
+    # one warm connection pool instead of re-handshaking per script
+    async with _http.get_session() as session:
+        async with FuturesPaginationTest(session=session) as tester:
+            # The two currencies are independent - analyze them concurrently
+            await asyncio.gather(
+                analyze_currency(tester, "BTC"),
+                analyze_currency(tester, "ETH")
+            )
 
 if __name__ == "__main__":
-    asyncio.run(test_futures_pagination()) 
\ No newline at end of file
+    async def _main():
+        try:
+            await test_futures_pagination()
+        finally:
+            # Standalone run owns the shared pool - release it on the way out
+            await _http.close_session()
+
+    asyncio.run(_main())
@@ -10,13 +10,19 @@ Combines all the best features:
 
 import asyncio
 import aiohttp
-import json
+import orjson
+import random
+import re
 import numpy as np
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 import math
 from dataclasses import dataclass
 
+# Option instrument name, e.g. BTC-25SEP20-6000-C. Matching up front is a
+# C-level test that replaces try/except around every malformed row
+_INSTR_RE = re.compile(r"^([A-Z]+)-(\d{1,2}[A-Z]{3}\d{2})-(\d+)-([CP])$")
+
 @dataclass
 class KeyLevel:
     """Represents a key price level with distance to current spot"""
@@ -36,18 +42,44 @@ class KeyLevel:
 class DeribitAnalyticsV4Comprehensive:
     """Comprehensive analytics engine with complete coverage and multi-timeframe analysis"""
     
-    def __init__(self):
+    def __init__(self, session: aiohttp.ClientSession = None):
         self.base_url = "https://www.deribit.com/api/v2"
-        self.session = None
+        # An externally provided session is shared with other consumers and
+        # must outlive this engine; only sessions we open get closed here
+        self.session = session
+        self._owns_session = session is None
         self.rate_limit_delay = 0.2  # 200ms between requests
-        
+        # Server-reported rate-limit budget, updated on every response so
+        # callers can throttle proactively before hitting a 429
+        self.rate_limit_remaining = None
+        self.rate_limit_reset = None
+        # Sorted strike universe per currency, filled by
+        # fetch_instruments_summary and reused by the flow analysis
+        self._strike_cache = {}
+
     async def __aenter__(self):
-        timeout = aiohttp.ClientTimeout(total=30)
-        self.session = aiohttp.ClientSession(timeout=timeout)
+        if self.session is None:
+            # Every fetch hits the same host - an explicitly bounded, keepalive
+            # connector reuses warm connections across all fetch_* methods and
+            # caps per-host parallelism below Deribit's throttle threshold
+            connector = aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=8,
+                keepalive_timeout=30,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True
+            )
+            timeout = aiohttp.ClientTimeout(total=30, connect=10)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers={"Accept": "application/json"}
+            )
+            self._owns_session = True
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
     
     def prepare_params(self, params: Dict) -> Dict:
@@ -62,27 +94,41 @@ class DeribitAnalyticsV4Comprehensive:
     
     async def fetch_with_retry(self, url: str, params: Dict = None, max_retries: int = 3) -> Dict:
         """Fetch data with retry logic and rate limiting"""
+        # The params never change between attempts - stringify them once
+        prepared_params = self.prepare_params(params) if params else {}
+
         for attempt in range(max_retries):
             try:
                 await asyncio.sleep(self.rate_limit_delay)
-                
-                prepared_params = self.prepare_params(params) if params else {}
+
                 async with self.session.get(url, params=prepared_params) as response:
+                    remaining = response.headers.get("x-ratelimit-remaining")
+                    if remaining is not None:
+                        self.rate_limit_remaining = float(remaining)
+                    reset = response.headers.get("x-ratelimit-reset")
+                    if reset is not None:
+                        self.rate_limit_reset = float(reset)
+
                     if response.status == 200:
-                        data = await response.json()
+                        # orjson parses the dense trade arrays several times faster than stdlib json
+                        data = orjson.loads(await response.read())
                         return data.get("result", data)
                     elif response.status == 429:
-                        wait_time = 2 ** attempt
-                        print(f"Rate limited, waiting {wait_time}s...")
+                        # Honor the server's backoff hint when present; jitter
+                        # spreads concurrent retries so they don't re-throttle
+                        # in lockstep
+                        retry_after = float(response.headers.get("Retry-After", 2 ** attempt))
+                        wait_time = retry_after * random.uniform(0.75, 1.25)
+                        print(f"Rate limited, waiting {wait_time:.1f}s...")
                         await asyncio.sleep(wait_time)
                     else:
                         print(f"HTTP {response.status} for {url}")
-                        
+
             except Exception as e:
                 print(f"Attempt {attempt + 1} failed for {url}: {e}")
                 if attempt == max_retries - 1:
                     raise
-                await asyncio.sleep(1)
+                await asyncio.sleep(2 ** attempt + random.random() * 0.5)
         
         return {}
     
@@ -117,56 +163,86 @@ class DeribitAnalyticsV4Comprehensive:
         print(f"\n=== Fetching Complete {currency} Options Flow ({hours_back}h) ===")
         
         end_time = datetime.now(timezone.utc)  # Use UTC
+        # Dedup needs only the ids - a seen-set plus one list avoids keeping a
+        # second full dict of the trade payloads
+        seen_ids = set()
         all_trades = []
-        unique_trades = {}
         total_chunks = math.ceil(hours_back / chunk_hours)
-        
+
         print(f"Using {chunk_hours}h chunks, {total_chunks} total chunks needed")
-        
+
+        # Chunk windows are independent timestamp ranges - fetch them
+        # concurrently under a bounded semaphore instead of serially with a
+        # 0.3s pause between each (fetch_with_retry still paces requests)
+        chunk_windows = []
         for chunk_idx in range(total_chunks):
             chunk_start_hours = chunk_idx * chunk_hours
             chunk_end_hours = min((chunk_idx + 1) * chunk_hours, hours_back)
-            
-            chunk_end = end_time - timedelta(hours=chunk_start_hours)
-            chunk_start = end_time - timedelta(hours=chunk_end_hours)
-            
-            print(f"Chunk {chunk_idx + 1}/{total_chunks}: {chunk_start.strftime('%m/%d %H:%M')} to {chunk_end.strftime('%m/%d %H:%M')}")
-            
-            params = {
-                "currency": currency,
-                "kind": "option",
-                "start_timestamp": int(chunk_start.timestamp() * 1000),
-                "end_timestamp": int(chunk_end.timestamp() * 1000),
-                "count": 1000,
-                "sorting": "desc"
-            }
-            
-            url = f"{self.base_url}/public/get_last_trades_by_currency_and_time"
-            result = await self.fetch_with_retry(url, params)
-            
+            chunk_windows.append((
+                end_time - timedelta(hours=chunk_end_hours),
+                end_time - timedelta(hours=chunk_start_hours)
+            ))
+
+        semaphore = asyncio.Semaphore(6)
+        url = f"{self.base_url}/public/get_last_trades_by_currency_and_time"
+
+        async def fetch_range(chunk_start: datetime, chunk_end: datetime, depth: int = 0) -> None:
+            """Fetch one time window, splitting at the midpoint while the API
+            reports more trades than the 1000-per-call cap returns"""
+            # The semaphore only guards the request itself; recursing after
+            # releasing it means split halves can't deadlock against parents
+            async with semaphore:
+                print(f"Range {chunk_start.strftime('%m/%d %H:%M')} to {chunk_end.strftime('%m/%d %H:%M')} (depth {depth})")
+
+                params = {
+                    "currency": currency,
+                    "kind": "option",
+                    "start_timestamp": int(chunk_start.timestamp() * 1000),
+                    "end_timestamp": int(chunk_end.timestamp() * 1000),
+                    "count": 1000,
+                    "sorting": "desc"
+                }
+
+                result = await self.fetch_with_retry(url, params)
+
             chunk_trades = []
+            has_more = False
             if isinstance(result, dict):
                 chunk_trades = result.get("trades", [])
                 has_more = result.get("has_more", False)
-                if has_more:
-                    print(f"  ⚠️  Chunk has more data (may need smaller chunks)")
             elif isinstance(result, list):
                 chunk_trades = result
-            
-            print(f"  Fetched {len(chunk_trades)} trades")
-            
-            # Deduplicate by trade_id
-            chunk_unique = 0
-            for trade in chunk_trades:
-                trade_id = trade.get("trade_id")
-                if trade_id and trade_id not in unique_trades:
-                    unique_trades[trade_id] = trade
-                    chunk_unique += 1
-            
-            print(f"  Added {chunk_unique} unique trades")
-            await asyncio.sleep(0.3)  # Be nice to the API
-        
-        all_trades = list(unique_trades.values())
+
+            if has_more and depth < 3:
+                # Dense window: re-fetch both halves so trades aren't silently
+                # dropped, without shrinking chunk_hours globally
+                mid = chunk_start + (chunk_end - chunk_start) / 2
+                print(f"  ⚠️  Range has more data - splitting at {mid.strftime('%m/%d %H:%M')}")
+                await asyncio.gather(
+                    fetch_range(chunk_start, mid, depth + 1),
+                    fetch_range(mid, chunk_end, depth + 1)
+                )
+                return
+
+            if has_more:
+                print(f"  ⚠️  Range still has more data at max split depth")
+
+            # Dedup against the shared set as each chunk lands - safe under
+            # asyncio's cooperative scheduling because there is no await
+            # between the membership test and the update
+            new_trades = [
+                trade for trade in chunk_trades
+                if (tid := trade.get("trade_id")) is not None and tid not in seen_ids
+            ]
+            seen_ids.update(trade["trade_id"] for trade in new_trades)
+            all_trades.extend(new_trades)
+
+            print(f"  Fetched {len(chunk_trades)} trades ({len(new_trades)} new)")
+
+        await asyncio.gather(
+            *[fetch_range(start, end) for start, end in chunk_windows]
+        )
+
         print(f"\nTotal unique trades collected: {len(all_trades)}")
         
         # Analyze coverage
@@ -204,6 +280,13 @@ class DeribitAnalyticsV4Comprehensive:
                 enhanced_instruments.append(instrument)
         
         print(f"Enhanced {len(enhanced_instruments)} instruments with summary data")
+
+        # Cache the sorted strike universe so the flow analysis can bucket
+        # trades with a binary search instead of re-deriving the strikes
+        strikes = np.unique([inst["strike"] for inst in enhanced_instruments])
+        if strikes.size:
+            self._strike_cache[currency] = strikes
+
         return enhanced_instruments
     
     async def fetch_complete_futures_trades(self, currency: str = "BTC", hours_back: int = 24, chunk_hours: int = 4) -> List[Dict]:
@@ -211,21 +294,23 @@ class DeribitAnalyticsV4Comprehensive:
         print(f"\n=== Fetching Complete {currency} Futures Data ({hours_back}h) ===")
         
         end_time = datetime.now(timezone.utc)  # Use UTC
-        all_trades = []
-        unique_trades = {}
         total_chunks = math.ceil(hours_back / chunk_hours)
         
         print(f"Using {chunk_hours}h chunks, {total_chunks} total chunks needed")
         
-        for chunk_idx in range(total_chunks):
+        url = f"{self.base_url}/public/get_last_trades_by_currency_and_time"
+        # The windows are independent, so fetch them concurrently; the
+        # semaphore keeps at most four requests in flight to stay inside
+        # Deribit's rate budget, same as the options pagination path
+        semaphore = asyncio.Semaphore(4)
+        
+        async def fetch_chunk(chunk_idx: int) -> List[Dict]:
             chunk_start_hours = chunk_idx * chunk_hours
             chunk_end_hours = min((chunk_idx + 1) * chunk_hours, hours_back)
             
             chunk_end = end_time - timedelta(hours=chunk_start_hours)
             chunk_start = end_time - timedelta(hours=chunk_end_hours)
             
-            print(f"Chunk {chunk_idx + 1}/{total_chunks}: {chunk_start.strftime('%m/%d %H:%M')} to {chunk_end.strftime('%m/%d %H:%M')}")
-            
             params = {
                 "currency": currency,
                 "kind": "future",
@@ -235,30 +320,30 @@ class DeribitAnalyticsV4Comprehensive:
                 "sorting": "desc"
             }
             
-            url = f"{self.base_url}/public/get_last_trades_by_currency_and_time"
-            result = await self.fetch_with_retry(url, params)
+            async with semaphore:
+                result = await self.fetch_with_retry(url, params)
             
             chunk_trades = []
             if isinstance(result, dict):
                 chunk_trades = result.get("trades", [])
-                has_more = result.get("has_more", False)
-                if has_more:
-                    print(f"  ⚠️  Chunk has more data (may need smaller chunks)")
+                if result.get("has_more", False):
+                    print(f"  ⚠️  Chunk {chunk_idx + 1} has more data (may need smaller chunks)")
             elif isinstance(result, list):
                 chunk_trades = result
             
-            print(f"  Fetched {len(chunk_trades)} trades")
-            
-            # Deduplicate by trade_id
-            chunk_unique = 0
+            print(f"Chunk {chunk_idx + 1}/{total_chunks}: {chunk_start.strftime('%m/%d %H:%M')} to {chunk_end.strftime('%m/%d %H:%M')} - {len(chunk_trades)} trades")
+            return chunk_trades
+        
+        chunk_results = await asyncio.gather(*(fetch_chunk(i) for i in range(total_chunks)))
+        
+        # Deduplicate by trade_id in a single pass over the merged chunks
+        # (overlaps only appear at window boundaries)
+        unique_trades = {}
+        for chunk_trades in chunk_results:
             for trade in chunk_trades:
                 trade_id = trade.get("trade_id")
                 if trade_id and trade_id not in unique_trades:
                     unique_trades[trade_id] = trade
-                    chunk_unique += 1
-            
-            print(f"  Added {chunk_unique} unique trades")
-            await asyncio.sleep(0.3)  # Be nice to the API
         
         all_trades = list(unique_trades.values())
         print(f"\nTotal unique futures trades collected: {len(all_trades)}")
@@ -624,123 +709,127 @@ class DeribitAnalyticsV4Comprehensive:
             f"Gamma Wall ({gamma_type})": gamma_wall_strike
         }
     
-    def analyze_complete_options_flow(self, trades: List[Dict], spot_price: float) -> Dict[str, float]:
+    def analyze_complete_options_flow(self, trades: List[Dict], spot_price: float, currency: str = None) -> Dict[str, float]:
         """Analyze complete options flow with time-weighted analysis"""
         if not trades:
             return {}
         
         print(f"Analyzing {len(trades)} options trades for flow patterns...")
-        
-        strike_flow = {}
-        total_volume = 0
-        
+
+        # Phase 1: parse trades into parallel columns (SoA)
+        strikes = []
+        is_call = []
+        amounts = []
+        prices = []
+        is_buy = []
+        timestamps = []
+
         for trade in trades:
-            try:
-                instrument = trade.get("instrument_name", "")
-                if not instrument:
-                    continue
-                
-                parts = instrument.split("-")
-                if len(parts) < 4:
-                    continue
-                
-                strike = float(parts[2])
-                option_type = parts[3]
-                amount = trade.get("amount", 0)
-                price = trade.get("price", 0)
-                direction = trade.get("direction", "")
-                timestamp = trade.get("timestamp", 0)
-                
-                if amount <= 0 or price <= 0:
-                    continue
-                
-                # Calculate notional value
-                notional = amount * price * spot_price
-                total_volume += notional
-                
-                # Time weighting - exponential decay
-                now_timestamp = datetime.now(timezone.utc).timestamp() * 1000
-                hours_ago = (now_timestamp - timestamp) / (1000 * 60 * 60)
-                time_weight = math.exp(-hours_ago / 12)  # 12-hour half-life
-                
-                # Delta-adjusted exposure
-                is_call = option_type == 'C'
-                delta = self.calculate_delta_simple(spot_price, strike, 1/365, is_call)  # Approximate 1 day to expiry
-                delta_exposure = notional * delta
-                
-                # Flow direction
-                flow_direction = 1 if direction == "buy" else -1
-                
-                if strike not in strike_flow:
-                    strike_flow[strike] = {
-                        "total_volume": 0,
-                        "net_flow": 0,
-                        "call_volume": 0,
-                        "put_volume": 0,
-                        "weighted_flow": 0
-                    }
-                
-                data = strike_flow[strike]
-                data["total_volume"] += notional
-                data["net_flow"] += delta_exposure * flow_direction
-                data["weighted_flow"] += delta_exposure * flow_direction * time_weight
-                
-                if is_call:
-                    data["call_volume"] += notional
-                else:
-                    data["put_volume"] += notional
-                
-            except Exception as e:
+            # Validate the instrument name in one regex match instead of
+            # wrapping the body in try/except for malformed rows
+            m = _INSTR_RE.match(trade.get("instrument_name", ""))
+            if not m:
                 continue
-        
-        if not strike_flow:
+
+            amount = trade.get("amount", 0)
+            price = trade.get("price", 0)
+            if amount <= 0 or price <= 0:
+                continue
+
+            strikes.append(int(m.group(3)))
+            is_call.append(m.group(4) == "C")
+            amounts.append(amount)
+            prices.append(price)
+            is_buy.append(trade.get("direction", "") == "buy")
+            timestamps.append(trade.get("timestamp", 0))
+
+        if not strikes:
             return {}
-        
-        print(f"Processed ${total_volume:,.0f} in total options volume across {len(strike_flow)} strikes")
-        
+
+        # Phase 2: vectorized per-trade math
+        strike_arr = np.asarray(strikes)
+        notional = np.asarray(amounts) * np.asarray(prices) * spot_price
+        total_volume = float(notional.sum())
+
+        # Time weighting - exponential decay, 12-hour half-life
+        now_ms = datetime.now(timezone.utc).timestamp() * 1000
+        hours_ago = (now_ms - np.asarray(timestamps, dtype=float)) / (1000 * 60 * 60)
+        time_weight = np.exp(-hours_ago / 12)
+
+        # Same heuristic as calculate_delta_simple, as one linear op + clip
+        # instead of a Python call per trade
+        moneyness = spot_price / strike_arr
+        call_mask = np.asarray(is_call)
+        sign = np.where(call_mask, 1.0, -1.0)
+        delta = np.clip(0.5 + sign * 0.4 * (moneyness - 1.0), 0.05, 0.95)
+
+        delta_exposure = notional * delta
+        flow_direction = np.where(np.asarray(is_buy), 1.0, -1.0)
+        signed_flow = delta_exposure * flow_direction
+        weighted_flow = signed_flow * time_weight
+
+        # Phase 3: group by strike with bincount (C-level aggregation),
+        # keeping the per-strike metrics as parallel arrays - the level
+        # extraction below is masks and argmax, no per-strike dicts needed.
+        # With a cached strike universe for this currency, bucket by binary
+        # search against the sorted strikes and skip the np.unique pass
+        cached_strikes = self._strike_cache.get(currency) if currency else None
+        if cached_strikes is not None and cached_strikes.size:
+            unique_strikes = cached_strikes
+            idx = np.minimum(np.searchsorted(unique_strikes, strike_arr), unique_strikes.size - 1)
+            known = unique_strikes[idx] == strike_arr
+            if not known.all():
+                # Trades on strikes missing from the book summary (e.g.
+                # series that expired since it was fetched) drop out here
+                idx = idx[known]
+                notional = notional[known]
+                weighted_flow = weighted_flow[known]
+                call_mask = call_mask[known]
+        else:
+            unique_strikes, idx = np.unique(strike_arr, return_inverse=True)
+        n_strikes = unique_strikes.size
+        volume_by_strike = np.bincount(idx, weights=notional, minlength=n_strikes)
+        weighted_by_strike = np.bincount(idx, weights=weighted_flow, minlength=n_strikes)
+        call_vol_by_strike = np.bincount(idx, weights=np.where(call_mask, notional, 0.0), minlength=n_strikes)
+        put_vol_by_strike = np.bincount(idx, weights=np.where(call_mask, 0.0, notional), minlength=n_strikes)
+
+        if not volume_by_strike.any():
+            return {}
+
+        print(f"Processed ${total_volume:,.0f} in total options volume across {np.count_nonzero(volume_by_strike)} strikes")
+
         # Calculate flow levels
         levels = {}
-        
+
         # 1. Highest Volume Strike (HVS)
-        hvs_strike = max(strike_flow.items(), key=lambda x: x[1]["total_volume"])[0]
-        levels["HVS"] = hvs_strike
-        
-        # 2. Max Pain Flow - most balanced call/put activity
-        balanced_strikes = []
-        for strike, data in strike_flow.items():
-            if data["call_volume"] > 0 and data["put_volume"] > 0:
-                balance_ratio = min(data["call_volume"], data["put_volume"]) / max(data["call_volume"], data["put_volume"])
-                balanced_strikes.append((strike, balance_ratio, data["total_volume"]))
-        
-        if balanced_strikes:
-            balanced_strikes.sort(key=lambda x: (x[1], x[2]), reverse=True)
-            levels["Max Pain Flow"] = balanced_strikes[0][0]
-        
+        levels["HVS"] = int(unique_strikes[volume_by_strike.argmax()])
+
+        # 2. Max Pain Flow - most balanced call/put activity, volume as tiebreak
+        balanced = (call_vol_by_strike > 0) & (put_vol_by_strike > 0)
+        if balanced.any():
+            balance_ratio = (
+                np.minimum(call_vol_by_strike[balanced], put_vol_by_strike[balanced])
+                / np.maximum(call_vol_by_strike[balanced], put_vol_by_strike[balanced])
+            )
+            # lexsort is ascending with the last key primary; take the top entry
+            best = np.lexsort((volume_by_strike[balanced], balance_ratio))[-1]
+            levels["Max Pain Flow"] = int(unique_strikes[balanced][best])
+
         # 3. Call Flow Resistance - above spot with highest weighted call flow
-        call_resistance = []
-        for strike, data in strike_flow.items():
-            if strike > spot_price and data["call_volume"] > data["put_volume"]:
-                call_resistance.append((strike, data["weighted_flow"]))
-        
-        if call_resistance:
-            call_resistance.sort(key=lambda x: x[1], reverse=True)
-            levels["Call Flow Resistance"] = call_resistance[0][0]
-        
+        call_side = (unique_strikes > spot_price) & (call_vol_by_strike > put_vol_by_strike)
+        if call_side.any():
+            levels["Call Flow Resistance"] = int(unique_strikes[call_side][weighted_by_strike[call_side].argmax()])
+
         # 4. Put Flow Support - below spot with highest weighted put flow
-        put_support = []
-        for strike, data in strike_flow.items():
-            if strike < spot_price and data["put_volume"] > data["call_volume"]:
-                put_support.append((strike, abs(data["weighted_flow"])))
-        
-        if put_support:
-            put_support.sort(key=lambda x: x[1], reverse=True)
-            levels["Put Flow Support"] = put_support[0][0]
-        
+        put_side = (unique_strikes < spot_price) & (put_vol_by_strike > call_vol_by_strike)
+        if put_side.any():
+            levels["Put Flow Support"] = int(unique_strikes[put_side][np.abs(weighted_by_strike[put_side]).argmax()])
+
         # 5. Volume-Weighted Average Strike (VWAS)
-        if total_volume > 0:
-            vwas = sum(strike * data["total_volume"] for strike, data in strike_flow.items()) / total_volume
-            levels["VWAS"] = vwas
-        
+        aggregated_volume = volume_by_strike.sum()
+        if aggregated_volume > 0:
+            levels["VWAS"] = float((unique_strikes * volume_by_strike).sum() / aggregated_volume)
+
         return levels
     
     async def generate_key_levels(self, currency: str = "BTC") -> Tuple[List[KeyLevel], Dict]:
@@ -766,7 +855,7 @@ class DeribitAnalyticsV4Comprehensive:
         max_24h, min_24h = self.calculate_1d_levels(stats_24h)
         hvl_levels = self.calculate_volume_profile_levels(futures_trades, spot_price, currency)
         option_analysis = await self.calculate_option_levels(instruments, spot_price)
-        flow_levels = self.analyze_complete_options_flow(options_trades, spot_price)
+        flow_levels = self.analyze_complete_options_flow(options_trades, spot_price, currency)
         
         # Combine all levels
         all_levels = {}
@@ -1,5 +1,9 @@
 import asyncio
 import aiohttp
+import heapq
+import orjson
+from aiolimiter import AsyncLimiter
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import List, Dict
 
@@ -11,7 +15,15 @@ class OptionsTradeAnalyzer:
         self.session = None
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        # Single-host workload: keep connections warm between the many small
+        # chunk requests and ask for compressed trade payloads
+        connector = aiohttp.TCPConnector(limit_per_host=64, ttl_dns_cache=300, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"Accept-Encoding": "gzip"}
+        )
+        # Token bucket keeps concurrent chunk fetches under Deribit's rate limit
+        self.limiter = AsyncLimiter(5, 1)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -26,11 +38,15 @@ class OptionsTradeAnalyzer:
                     if response.status == 429:
                         wait_time = 2 ** attempt
                         print(f"Rate limited, waiting {wait_time}s before retry {attempt + 1}")
+                        # Drain the shared bucket so concurrent fetchers
+                        # also pause instead of piling on more 429s
+                        self.limiter._level = self.limiter.max_rate
                         await asyncio.sleep(wait_time)
                         continue
                     
                     response.raise_for_status()
-                    data = await response.json()
+                    # orjson parses the dense trade arrays several times faster than stdlib json
+                    data = orjson.loads(await response.read())
                     return data.get("result", data)
                     
             except Exception as e:
@@ -109,16 +125,23 @@ class OptionsTradeAnalyzer:
         print(f"Gap from requested start: {gap_hours:.2f} hours")
         print(f"Coverage: {(actual_hours/hours_back)*100:.1f}% of requested timeframe")
         
-        # Analyze trade distribution by hour
-        hourly_counts = {}
-        for ts in timestamps:
-            hour = datetime.fromtimestamp(ts / 1000).strftime('%Y-%m-%d %H:00')
-            hourly_counts[hour] = hourly_counts.get(hour, 0) + 1
-        
+        # Analyze trade distribution by hour - bucket on integer hours since
+        # epoch (ms // 3.6e6) so strftime only runs for the buckets we print
+        bucket_counts = Counter(ts // 3_600_000 for ts in timestamps)
+
         print(f"\nTrade distribution by hour (last 10 hours):")
-        sorted_hours = sorted(hourly_counts.items(), reverse=True)[:10]
-        for hour, count in sorted_hours:
+        # nlargest is O(N log 10) vs a full sort of every bucket
+        sorted_buckets = heapq.nlargest(10, bucket_counts.items())
+        for bucket, count in sorted_buckets:
+            hour = datetime.fromtimestamp(bucket * 3600).strftime('%Y-%m-%d %H:00')
             print(f"  {hour}: {count} trades")
+
+        # Keep the returned distribution keyed by formatted hour as before;
+        # this is one conversion per bucket, not per trade
+        hourly_counts = {
+            datetime.fromtimestamp(bucket * 3600).strftime('%Y-%m-%d %H:00'): count
+            for bucket, count in bucket_counts.items()
+        }
         
         # Check if we hit the 1000 limit
         hit_limit = len(trades) >= 1000
@@ -128,21 +151,20 @@ class OptionsTradeAnalyzer:
             print("⚠️  We may be missing older trades due to the 1000 limit!")
             print("Consider implementing timestamp-based pagination for complete coverage.")
         
-        # Analyze instrument diversity
-        instruments = set()
+        # Analyze instrument diversity - dedupe names first so the
+        # split/float parsing runs once per unique instrument (typically
+        # 10-50x fewer than the trade count) instead of once per trade
+        instruments = {trade.get("instrument_name", "") for trade in trades}
+        instruments.discard("")
+
         strikes = set()
-        for trade in trades:
-            instrument = trade.get("instrument_name", "")
-            if instrument:
-                instruments.add(instrument)
-                # Extract strike
-                parts = instrument.split("-")
-                if len(parts) >= 3:
-                    try:
-                        strike = float(parts[2])
-                        strikes.add(strike)
-                    except ValueError:
-                        pass
+        for instrument in instruments:
+            parts = instrument.split("-")
+            if len(parts) >= 3:
+                try:
+                    strikes.add(float(parts[2]))
+                except ValueError:
+                    pass
         
         print(f"\nInstrument diversity:")
         print(f"Unique instruments traded: {len(instruments)}")
@@ -169,53 +191,68 @@ class OptionsTradeAnalyzer:
         print(f"Breaking {hours_back}h into {chunk_hours}h chunks")
         
         end_time = datetime.now()
-        all_trades = []
-        chunks_processed = 0
-        
+
+        # Chunk windows are independent - fetch them concurrently under a
+        # bounded semaphore + shared rate limiter instead of serially
+        chunk_windows = []
         for i in range(0, hours_back, chunk_hours):
-            chunk_end = end_time - timedelta(hours=i)
-            chunk_start = end_time - timedelta(hours=min(i + chunk_hours, hours_back))
-            
-            print(f"\nChunk {chunks_processed + 1}: {chunk_start.strftime('%H:%M')} to {chunk_end.strftime('%H:%M')}")
-            
-            params = {
-                "currency": currency,
-                "kind": "option",
-                "start_timestamp": int(chunk_start.timestamp() * 1000),
-                "end_timestamp": int(chunk_end.timestamp() * 1000),
-                "count": 1000,
-                "sorting": "desc"
-            }
-            
-            url = f"{self.base_url}/public/get_last_trades_by_currency_and_time"
-            result = await self.fetch_with_retry(url, params)
-            
+            chunk_windows.append((
+                end_time - timedelta(hours=min(i + chunk_hours, hours_back)),
+                end_time - timedelta(hours=i)
+            ))
+
+        semaphore = asyncio.Semaphore(4)
+
+        async def fetch_chunk(chunk_idx: int, chunk_start: datetime, chunk_end: datetime) -> List[Dict]:
+            async with semaphore, self.limiter:
+                print(f"\nChunk {chunk_idx + 1}: {chunk_start.strftime('%H:%M')} to {chunk_end.strftime('%H:%M')}")
+
+                params = {
+                    "currency": currency,
+                    "kind": "option",
+                    "start_timestamp": int(chunk_start.timestamp() * 1000),
+                    "end_timestamp": int(chunk_end.timestamp() * 1000),
+                    "count": 1000,
+                    "sorting": "desc"
+                }
+
+                url = f"{self.base_url}/public/get_last_trades_by_currency_and_time"
+                result = await self.fetch_with_retry(url, params)
+
             chunk_trades = []
             if isinstance(result, dict):
                 chunk_trades = result.get("trades", [])
             elif isinstance(result, list):
                 chunk_trades = result
-            
+
             print(f"  Fetched {len(chunk_trades)} trades")
+            return chunk_trades
+
+        chunk_results = await asyncio.gather(
+            *[fetch_chunk(i, start, end) for i, (start, end) in enumerate(chunk_windows)]
+        )
+
+        all_trades = []
+        for chunk_trades in chunk_results:
             all_trades.extend(chunk_trades)
-            chunks_processed += 1
-            
-            # Small delay to be nice to the API
-            await asyncio.sleep(0.5)
-        
-        # Remove duplicates based on trade_id
-        unique_trades = {}
+        chunks_processed = len(chunk_windows)
+
+        # Remove duplicates based on trade_id - a set of seen ids avoids
+        # storing a second copy of every trade in a dict
+        seen_ids = set()
+        unique_trades = []
         for trade in all_trades:
             trade_id = trade.get("trade_id")
-            if trade_id and trade_id not in unique_trades:
-                unique_trades[trade_id] = trade
-        
+            if trade_id is not None and trade_id not in seen_ids:
+                seen_ids.add(trade_id)
+                unique_trades.append(trade)
+
         print(f"\nPagination Results:")
         print(f"Total trades collected: {len(all_trades)}")
         print(f"Unique trades after deduplication: {len(unique_trades)}")
         print(f"Chunks processed: {chunks_processed}")
-        
-        return list(unique_trades.values())
+
+        return unique_trades
 
 async def main():
     """Main analysis function"""
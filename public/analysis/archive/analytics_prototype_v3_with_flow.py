@@ -1,10 +1,18 @@
 import asyncio
 import aiohttp
 import math
+import operator
+import time
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr
+
+# 1/sqrt(2*pi) for the inline normal pdf
+INV_SQRT_2PI = 0.3989422804014327
+
+# C-level field extraction beats 5 chained dict.get calls per trade
+_trade_fields = operator.itemgetter("instrument_name", "amount", "price", "direction", "timestamp")
 
 class DeribitAnalyticsV3:
     """Enhanced analytics engine with options flow analysis"""
@@ -12,6 +20,10 @@ class DeribitAnalyticsV3:
     def __init__(self, base_url: str = "https://deribit.com/api/v2"):
         self.base_url = base_url
         self.session = None
+        # Small TTL cache so back-to-back runs reuse a fresh spot price:
+        # {currency: (fetched_at, price)}
+        self._index_price_cache: Dict[str, tuple] = {}
+        self.index_price_ttl = 5.0    # spot moves fast, keep this short
     
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
@@ -52,11 +64,42 @@ class DeribitAnalyticsV3:
         
         return {}
     
+    async def _rpc_batch(self, calls: List[tuple], max_retries: int = 3) -> List:
+        """POST a JSON-RPC 2.0 batch so multiple calls share one round-trip"""
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+
+        for attempt in range(max_retries):
+            try:
+                async with self.session.post(f"{self.base_url}/", json=payload) as response:
+                    if response.status == 429:  # Rate limited
+                        wait_time = 2 ** attempt
+                        print(f"Rate limited, waiting {wait_time}s before retry {attempt + 1}")
+                        await asyncio.sleep(wait_time)
+                        continue
+
+                    response.raise_for_status()
+                    data = await response.json()
+
+                    # Batch responses can arrive out of order - realign by id
+                    by_id = {item.get("id"): item.get("result", {}) for item in data}
+                    return [by_id.get(i, {}) for i in range(len(calls))]
+
+            except Exception as e:
+                if attempt == max_retries - 1:
+                    print(f"Batch request failed after {max_retries} attempts: {e}")
+                    return [{} for _ in calls]
+                await asyncio.sleep(1)
+
+        return [{} for _ in calls]
+
     async def fetch_instruments(self, currency: str = "BTC") -> List[Dict]:
         """Fetch all available instruments for a currency"""
         url = f"{self.base_url}/public/get_instruments"
         params = {"currency": currency, "expired": False}
-        
+
         result = await self.fetch_with_retry(url, params)
         return result if isinstance(result, list) else []
     
@@ -137,11 +180,18 @@ class DeribitAnalyticsV3:
     
     async def fetch_index_price(self, currency: str = "BTC") -> float:
         """Fetch current index price"""
+        cached = self._index_price_cache.get(currency)
+        if cached and time.monotonic() - cached[0] < self.index_price_ttl:
+            return cached[1]
+
         url = f"{self.base_url}/public/get_index_price"
         params = {"index_name": f"{currency.lower()}_usd"}
-        
+
         result = await self.fetch_with_retry(url, params)
-        return result.get("index_price", 0)
+        price = result.get("index_price", 0)
+        if price > 0:
+            self._index_price_cache[currency] = (time.monotonic(), price)
+        return price
     
     def black_scholes_delta(self, S: float, K: float, T: float, r: float, sigma: float, option_type: str) -> float:
         """Calculate Black-Scholes delta"""
@@ -150,10 +200,11 @@ class DeribitAnalyticsV3:
         
         d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
         
+        # ndtr is the C-level normal CDF, skips scipy.stats dispatch overhead
         if option_type == "call":
-            return norm.cdf(d1)
+            return ndtr(d1)
         else:  # put
-            return norm.cdf(d1) - 1
+            return ndtr(d1) - 1
     
     def black_scholes_gamma(self, S: float, K: float, T: float, r: float, sigma: float) -> float:
         """Calculate Black-Scholes gamma"""
@@ -161,80 +212,92 @@ class DeribitAnalyticsV3:
             return 0.0
         
         d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
-        return norm.pdf(d1) / (S * sigma * math.sqrt(T))
+        pdf_d1 = math.exp(-0.5 * d1 * d1) * INV_SQRT_2PI
+        return pdf_d1 / (S * sigma * math.sqrt(T))
     
     def analyze_options_flow(self, trades: List[Dict], spot_price: float) -> Dict[str, float]:
         """Analyze options flow to identify key levels from actual trading"""
         if not trades:
             return {}
         
-        # Group trades by strike price and calculate flow metrics
-        strike_flow = {}
-        
+        # Phase 1: parse trades into parallel columns (SoA)
+        strikes = []
+        is_call = []
+        amounts = []
+        prices = []
+        is_buy = []
+        timestamps = []
+
         for trade in trades:
             try:
-                # Parse instrument name to extract strike
-                instrument = trade.get("instrument_name", "")
+                # Single C-level extraction of all trade fields
+                instrument, amount, price, direction, timestamp = _trade_fields(trade)
                 if not instrument:
                     continue
-                
+
                 # Format: BTC-25SEP20-6000-P or BTC-25SEP20-6000-C
                 parts = instrument.split("-")
                 if len(parts) < 4:
                     continue
-                
-                strike = float(parts[2])
-                option_type = parts[3]  # P or C
-                
-                amount = trade.get("amount", 0)
-                price = trade.get("price", 0)
-                direction = trade.get("direction", "")
-                timestamp = trade.get("timestamp", 0)
-                
-                # Calculate notional value (premium paid)
-                notional = amount * price * spot_price  # Convert to USD
-                
-                # Weight recent trades more heavily (exponential decay)
-                hours_ago = (datetime.now().timestamp() * 1000 - timestamp) / (1000 * 3600)
-                time_weight = math.exp(-hours_ago / 12)  # Half-life of 12 hours
-                
-                # Calculate delta-adjusted exposure
-                # Simplified delta calculation (more accurate would use Black-Scholes)
-                moneyness = spot_price / strike
-                if option_type == "C":  # Call
-                    approx_delta = max(0.05, min(0.95, 0.5 + 0.4 * (moneyness - 1)))
-                else:  # Put
-                    approx_delta = max(0.05, min(0.95, 0.5 - 0.4 * (moneyness - 1)))
-                
-                delta_exposure = notional * approx_delta
-                
-                # Adjust for buy/sell direction
-                flow_direction = 1 if direction == "buy" else -1
-                
-                if strike not in strike_flow:
-                    strike_flow[strike] = {
-                        "total_volume": 0,
-                        "net_flow": 0,
-                        "call_volume": 0,
-                        "put_volume": 0,
-                        "weighted_flow": 0
-                    }
-                
-                strike_flow[strike]["total_volume"] += notional
-                strike_flow[strike]["net_flow"] += delta_exposure * flow_direction
-                strike_flow[strike]["weighted_flow"] += delta_exposure * flow_direction * time_weight
-                
-                if option_type == "C":
-                    strike_flow[strike]["call_volume"] += notional
-                else:
-                    strike_flow[strike]["put_volume"] += notional
-                    
-            except (ValueError, IndexError) as e:
+
+                strikes.append(float(parts[2]))
+                is_call.append(parts[3] == "C")
+                amounts.append(amount)
+                prices.append(price)
+                is_buy.append(direction == "buy")
+                timestamps.append(timestamp)
+
+            except (KeyError, ValueError, IndexError):
                 continue
-        
+
+        if not strikes:
+            return {}
+
+        # Phase 2: vectorized per-trade math
+        strikes_arr = np.asarray(strikes)
+        notional = np.asarray(amounts) * np.asarray(prices) * spot_price  # USD premium
+
+        # Weight recent trades more heavily (exponential decay, 12h half-life)
+        now_ms = datetime.now().timestamp() * 1000
+        hours_ago = (now_ms - np.asarray(timestamps, dtype=float)) / (1000 * 3600)
+        time_weight = np.exp(-hours_ago / 12)
+
+        # Delta heuristic as a single linear op + clip instead of
+        # per-trade branches (more accurate would use Black-Scholes)
+        moneyness = spot_price / strikes_arr
+        sign = np.where(np.asarray(is_call), 1.0, -1.0)
+        approx_delta = np.clip(0.5 + sign * 0.4 * (moneyness - 1.0), 0.05, 0.95)
+
+        delta_exposure = notional * approx_delta
+        flow_direction = np.where(np.asarray(is_buy), 1.0, -1.0)
+        signed_flow = delta_exposure * flow_direction
+        weighted_flow = signed_flow * time_weight
+
+        # Phase 3: aggregate flow metrics per strike
+        strike_flow = {}
+        for strike, call_flag, vol, net, weighted in zip(strikes, is_call, notional, signed_flow, weighted_flow):
+            data = strike_flow.get(strike)
+            if data is None:
+                data = strike_flow[strike] = {
+                    "total_volume": 0,
+                    "net_flow": 0,
+                    "call_volume": 0,
+                    "put_volume": 0,
+                    "weighted_flow": 0
+                }
+
+            data["total_volume"] += vol
+            data["net_flow"] += net
+            data["weighted_flow"] += weighted
+
+            if call_flag:
+                data["call_volume"] += vol
+            else:
+                data["put_volume"] += vol
+
         if not strike_flow:
             return {}
-        
+
         # Find key levels based on flow analysis
         levels = {}
         
@@ -336,62 +399,72 @@ class DeribitAnalyticsV3:
         if not book_data:
             return {}
         
-        # Group by strike and calculate total open interest
-        strike_oi = {}
+        # Parse instruments into parallel columns, then vectorize the delta math
         today = datetime.now().strftime("%d%b%y").upper()
-        
+
+        strikes = []
+        is_call = []
+        open_interests = []
+        is_0dte = []
+
         for instrument in book_data:
             try:
                 name = instrument.get("instrument_name", "")
                 if not name:
                     continue
-                
+
                 parts = name.split("-")
                 if len(parts) < 4:
                     continue
-                
-                strike = float(parts[2])
-                option_type = parts[3]
-                expiry = parts[1]
-                
+
                 open_interest = instrument.get("open_interest", 0)
                 if open_interest <= 0:
                     continue
-                
-                # Calculate delta-adjusted exposure
-                # Simplified calculation
-                moneyness = spot_price / strike
-                if option_type == "C":
-                    delta = max(0.05, min(0.95, 0.5 + 0.4 * (moneyness - 1)))
-                else:
-                    delta = max(0.05, min(0.95, 0.5 - 0.4 * (moneyness - 1)))
-                
-                delta_exposure = open_interest * abs(delta) * spot_price
-                
-                if strike not in strike_oi:
-                    strike_oi[strike] = {
-                        "total_oi": 0,
-                        "call_oi": 0,
-                        "put_oi": 0,
-                        "delta_exposure": 0,
-                        "dte_0_oi": 0
-                    }
-                
-                strike_oi[strike]["total_oi"] += open_interest
-                strike_oi[strike]["delta_exposure"] += delta_exposure
-                
-                if option_type == "C":
-                    strike_oi[strike]["call_oi"] += open_interest
-                else:
-                    strike_oi[strike]["put_oi"] += open_interest
-                
-                # Check if it's 0DTE
-                if expiry == today:
-                    strike_oi[strike]["dte_0_oi"] += open_interest
-                    
+
+                strikes.append(float(parts[2]))
+                is_call.append(parts[3] == "C")
+                open_interests.append(open_interest)
+                is_0dte.append(parts[1] == today)
+
             except (ValueError, IndexError):
                 continue
-        
+
+        if not strikes:
+            return {}
+
+        # Delta heuristic as one linear op + clip (simplified calculation)
+        strikes_arr = np.asarray(strikes)
+        moneyness = spot_price / strikes_arr
+        sign = np.where(np.asarray(is_call), 1.0, -1.0)
+        delta = np.clip(0.5 + sign * 0.4 * (moneyness - 1.0), 0.05, 0.95)
+
+        delta_exposure = np.asarray(open_interests) * np.abs(delta) * spot_price
+
+        # Group by strike and accumulate open interest
+        strike_oi = {}
+        for strike, call_flag, oi, exposure, dte0_flag in zip(strikes, is_call, open_interests, delta_exposure, is_0dte):
+            data = strike_oi.get(strike)
+            if data is None:
+                data = strike_oi[strike] = {
+                    "total_oi": 0,
+                    "call_oi": 0,
+                    "put_oi": 0,
+                    "delta_exposure": 0,
+                    "dte_0_oi": 0
+                }
+
+            data["total_oi"] += oi
+            data["delta_exposure"] += exposure
+
+            if call_flag:
+                data["call_oi"] += oi
+            else:
+                data["put_oi"] += oi
+
+            # Check if it's 0DTE
+            if dte0_flag:
+                data["dte_0_oi"] += oi
+
         if not strike_oi:
             return {}
         
@@ -436,18 +509,66 @@ class DeribitAnalyticsV3:
     async def get_all_levels(self, currency: str = "BTC") -> Dict[str, any]:
         """Get all analytics levels for a currency"""
         print(f"\n=== Analyzing {currency} ===")
-        
-        # Fetch all required data
-        spot_price = await self.fetch_index_price(currency)
+
+        hours_back = 24
+        end_time = datetime.now()
+        start_time = end_time - timedelta(hours=hours_back)
+
+        # A fresh cached spot price lets the batch drop the index call
+        # entirely on rapid re-runs; the rest still share one round-trip
+        cached = self._index_price_cache.get(currency)
+        if cached and time.monotonic() - cached[0] < self.index_price_ttl:
+            spot_price = cached[1]
+            index_calls = []
+        else:
+            spot_price = None
+            index_calls = [("public/get_index_price", {"index_name": f"{currency.lower()}_usd"})]
+
+        # Batch the endpoint calls into a single JSON-RPC round-trip
+        results = await self._rpc_batch(index_calls + [
+            ("public/get_book_summary_by_currency", {"currency": currency, "kind": "option"}),
+            ("public/get_last_trades_by_currency", {
+                "currency": currency,
+                "kind": "future",
+                "count": 1000,
+                "include_old": True
+            }),
+            ("public/get_last_trades_by_currency_and_time", {
+                "currency": currency,
+                "kind": "option",
+                "start_timestamp": int(start_time.timestamp() * 1000),
+                "end_timestamp": int(end_time.timestamp() * 1000),
+                "count": 1000,
+                "sorting": "desc"
+            })
+        ])
+
+        book_result, futures_result, options_result = results[-3:]
+        if spot_price is None:
+            index_result = results[0]
+            spot_price = index_result.get("index_price", 0) if isinstance(index_result, dict) else 0
+            if spot_price > 0:
+                self._index_price_cache[currency] = (time.monotonic(), spot_price)
         print(f"Current {currency} price: ${spot_price:,.2f}")
-        
-        # Fetch data in parallel for efficiency
-        book_data, futures_trades, options_trades = await asyncio.gather(
-            self.fetch_book_summary_by_currency(currency),
-            self.fetch_futures_trades(currency),
-            self.fetch_options_trades(currency)
-        )
-        
+
+        book_data = book_result if isinstance(book_result, list) else []
+
+        # Futures trades: unwrap response shape, then keep only the recent window
+        futures_trades = []
+        if isinstance(futures_result, dict):
+            futures_trades = futures_result.get("trades", [])
+        elif isinstance(futures_result, list):
+            futures_trades = futures_result
+
+        cutoff_timestamp = int(start_time.timestamp() * 1000)
+        futures_trades = [t for t in futures_trades if t.get("timestamp", 0) >= cutoff_timestamp]
+
+        options_trades = []
+        if isinstance(options_result, dict):
+            options_trades = options_result.get("trades", [])
+        elif isinstance(options_result, list):
+            options_trades = options_result
+
         print(f"Fetched {len(book_data)} instruments, {len(futures_trades)} futures trades, {len(options_trades)} options trades")
         
         # Calculate all levels
@@ -4,8 +4,12 @@ Simple test to compare futures data coverage
 """
 
 import asyncio
+import numpy as np
 from analytics_prototype_v4_comprehensive import DeribitAnalyticsV4Comprehensive
 
+# Structured dtype so one fromiter pass pulls both columns out of the dicts
+_TRADE_DTYPE = np.dtype([("p", "f8"), ("a", "f8")])
+
 async def test_futures_coverage():
     """Test futures data coverage comparison"""
     print("=" * 80)
@@ -19,13 +23,22 @@ async def test_futures_coverage():
                 print(f"Testing {currency} Futures Data Coverage")
                 print(f"{'='*60}")
                 
-                # Test standard approach (1000 limit)
-                print("\n--- Standard Futures Fetch (1000 limit) ---")
-                standard_trades = await analytics.fetch_futures_trades(currency, hours_back=24)
-                
-                # Test paginated approach (complete)
-                print("\n--- Paginated Futures Fetch (complete) ---")
-                paginated_trades = await analytics.fetch_complete_futures_trades(currency, hours_back=24, chunk_hours=4)
+                # Both fetches hit the same endpoint and are I/O-bound, so
+                # overlap them; the standard fetch finishes inside the
+                # paginated fetch's window and becomes effectively free.
+                # Guard each one so a failure doesn't cancel the other.
+                async def fetch_safe(coro, label):
+                    try:
+                        return await coro
+                    except Exception as e:
+                        print(f"⚠️  {label} fetch failed: {e}")
+                        return []
+
+                print("\n--- Fetching standard (1000 limit) and paginated (complete) concurrently ---")
+                standard_trades, paginated_trades = await asyncio.gather(
+                    fetch_safe(analytics.fetch_futures_trades(currency, hours_back=24), "Standard"),
+                    fetch_safe(analytics.fetch_complete_futures_trades(currency, hours_back=24, chunk_hours=4), "Paginated")
+                )
                 
                 # Compare results
                 print(f"\n📊 COMPARISON RESULTS - {currency}")
@@ -51,42 +64,54 @@ async def test_futures_coverage():
                 def analyze_volume_profile(trades, label):
                     if not trades:
                         return {}
-                    
-                    price_levels = {}
-                    total_volume = 0
-                    
-                    for trade in trades:
-                        price = trade.get("price", 0)
-                        amount = trade.get("amount", 0)
-                        
-                        if price <= 0 or amount <= 0:
-                            continue
-                        
-                        # Round price to create levels
-                        level = round(price / 10) * 10 if price > 1000 else round(price)
-                        price_levels[level] = price_levels.get(level, 0) + amount
-                        total_volume += amount
-                    
-                    if not price_levels:
+
+                    # Vectorized: one pass pulls prices/amounts into columns,
+                    # then the bucketing and aggregation run in C instead of
+                    # per-trade dict ops in the interpreter
+                    arr = np.fromiter(
+                        ((t.get("price", 0), t.get("amount", 0)) for t in trades),
+                        dtype=_TRADE_DTYPE, count=len(trades)
+                    )
+                    mask = (arr["p"] > 0) & (arr["a"] > 0)
+                    prices = arr["p"][mask]
+                    amounts = arr["a"][mask]
+
+                    if prices.size == 0:
                         return {}
-                    
-                    # Find HVL
-                    hvl_price = max(price_levels.items(), key=lambda x: x[1])[0]
-                    hvl_volume = price_levels[hvl_price]
-                    
-                    # Calculate price range
-                    prices = [trade.get("price", 0) for trade in trades if trade.get("price", 0) > 0]
-                    price_range = max(prices) - min(prices) if prices else 0
-                    
+
+                    # Round prices to levels: $10 buckets above $1000, $1 below.
+                    # A batch is almost always uniformly one side of $1000
+                    # (BTC always above), so hoist the bucket choice and only
+                    # fall back to the elementwise np.where for mixed batches
+                    pmin = prices.min()
+                    pmax = prices.max()
+                    if pmin > 1000:
+                        levels = np.round(prices / 10) * 10
+                    elif pmax <= 1000:
+                        levels = np.round(prices)
+                    else:
+                        levels = np.where(prices > 1000, np.round(prices / 10) * 10, np.round(prices))
+
+                    unique_levels, inverse = np.unique(levels, return_inverse=True)
+                    level_volumes = np.bincount(inverse, weights=amounts)
+                    total_volume = float(amounts.sum())
+
+                    # HVL falls out of the same aggregation via argmax
+                    idx = level_volumes.argmax()
+                    hvl_price = float(unique_levels[idx])
+                    hvl_volume = float(level_volumes[idx])
+
+                    price_range = float(pmax - pmin)
+
                     print(f"\n{label}:")
                     print(f"  Total Volume: {total_volume:,.2f}")
-                    print(f"  Price Levels: {len(price_levels)}")
+                    print(f"  Price Levels: {unique_levels.size}")
                     print(f"  HVL: ${hvl_price:,.0f} (Volume: {hvl_volume:,.2f})")
                     print(f"  Price Range: ${price_range:,.2f}")
-                    
+
                     return {
                         "total_volume": total_volume,
-                        "price_levels": len(price_levels),
+                        "price_levels": int(unique_levels.size),
                         "hvl_price": hvl_price,
                         "hvl_volume": hvl_volume,
                         "price_range": price_range
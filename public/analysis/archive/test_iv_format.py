@@ -1,44 +1,64 @@
 #!/usr/bin/env python3
 import asyncio
-import aiohttp
-
-async def check_iv_format():
-    async with aiohttp.ClientSession() as session:
-        url = 'https://www.deribit.com/api/v2/public/get_book_summary_by_currency'
-        params = {'currency': 'BTC', 'kind': 'option'}
-        
-        async with session.get(url, params=params) as response:
-            data = await response.json()
-            result = data.get('result', [])
-            
-            print("Checking IV format from Deribit API:")
-            print("=" * 50)
-            
-            spot_price = 104800  # approximate current BTC price
-            count = 0
-            
-            for instrument in result:
-                if count >= 5:  # Just check first 5 ATM options
-                    break
-                    
-                if instrument.get('open_interest', 0) > 0:
-                    try:
-                        strike = float(instrument.get('instrument_name', '').split('-')[2])
-                        if abs(strike - spot_price) / spot_price < 0.05:  # Within 5% of ATM
-                            mark_iv = instrument.get('mark_iv')
-                            bid_iv = instrument.get('bid_iv')
-                            ask_iv = instrument.get('ask_iv')
-                            
-                            print(f"Instrument: {instrument.get('instrument_name')}")
-                            print(f"  Strike: {strike}")
-                            print(f"  mark_iv: {mark_iv} (type: {type(mark_iv)})")
-                            print(f"  bid_iv: {bid_iv}")
-                            print(f"  ask_iv: {ask_iv}")
-                            print(f"  open_interest: {instrument.get('open_interest')}")
-                            print()
-                            count += 1
-                    except:
-                        continue
+import orjson
+import _http
+
+async def check_iv_format(session):
+    url = 'https://www.deribit.com/api/v2/public/get_book_summary_by_currency'
+    params = {'currency': 'BTC', 'kind': 'option'}
+
+    async with session.get(url, params=params) as response:
+        # orjson decodes the raw bytes several times faster than the
+        # stdlib json path behind response.json()
+        data = orjson.loads(await response.read())
+        result = data.get('result', [])
+
+        print("Checking IV format from Deribit API:")
+        print("=" * 50)
+
+        spot_price = 104800  # approximate current BTC price
+        # Hoist the ATM band so the per-row check is two comparisons
+        low, high = spot_price * 0.95, spot_price * 1.05
+        count = 0
+
+        for instrument in result:
+            if count >= 5:  # Just check first 5 ATM options
+                break
+
+            oi = instrument.get('open_interest', 0)
+            if oi > 0:
+                # Guarded parse instead of exception-driven control flow;
+                # validating the strike text keeps malformed names off the
+                # exception machinery entirely
+                parts = instrument.get('instrument_name', '').split('-')
+                if len(parts) < 3:
+                    continue
+                s = parts[2]
+                if not s.replace('.', '', 1).isdigit():
+                    continue
+                strike = float(s)
+                if low <= strike <= high:  # Within 5% of ATM
+                    mark_iv = instrument.get('mark_iv')
+                    bid_iv = instrument.get('bid_iv')
+                    ask_iv = instrument.get('ask_iv')
+
+                    print(f"Instrument: {instrument.get('instrument_name')}")
+                    print(f"  Strike: {strike}")
+                    print(f"  mark_iv: {mark_iv} (type: {type(mark_iv)})")
+                    print(f"  bid_iv: {bid_iv}")
+                    print(f"  ask_iv: {ask_iv}")
+                    print(f"  open_interest: {oi}")
+                    print()
+                    count += 1
 
 if __name__ == "__main__":
-    asyncio.run(check_iv_format()) 
\ No newline at end of file
+    async def _main():
+        try:
+            # Reuse the shared pooled session so back-to-back script runs
+            # within one process skip the TLS handshake
+            async with _http.get_session() as session:
+                await check_iv_format(session)
+        finally:
+            await _http.close_session()
+
+    asyncio.run(_main())